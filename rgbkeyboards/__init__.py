@@ -3,8 +3,32 @@ Author: RedFantom
 License: GNU GPLv3
 Copyright (c) 2017-2018 RedFantom
 """
+import sys
 from rgbkeyboards.keyboards import Keyboards, BACKENDS, PATHS
-from rgbkeyboards import keygroups
+from rgbkeyboards import keygroups, registry
 from rgbkeyboards.keyboard import BaseKeyboard
+from rgbkeyboards.monitor import DeviceMonitor
 from rgbkeyboards.controller import KeyboardController
+from rgbkeyboards.clock import MonotonicClock, VirtualClock
 from rgbkeyboards import effects
+from rgbkeyboards._queue import is_python_3
+
+# Classes that import asyncio or concurrent.futures, loaded on first
+# access on Python 3.7+ to keep importing the package fast
+_LAZY = {
+    "AsyncKeyboardController": "rgbkeyboards.aiocontroller",
+    "KeyboardGroup": "rgbkeyboards.group",
+}
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """Import AsyncKeyboardController and KeyboardGroup when used"""
+        if name not in _LAZY:
+            raise AttributeError("module {} has no attribute {}".format(__name__, name))
+        from importlib import import_module
+        value = getattr(import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+elif is_python_3():
+    from rgbkeyboards.aiocontroller import AsyncKeyboardController
+    from rgbkeyboards.group import KeyboardGroup
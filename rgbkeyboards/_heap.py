@@ -0,0 +1,99 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+
+
+class IndexedHeap(object):
+    """
+    Binary min-heap of items that can be removed by id
+
+    Every item is identified by a unique id. The position of every id in
+    the heap is tracked, so an item can be removed in O(log n) without
+    leaving a stale entry behind. Items with an equal priority are
+    popped in the order they were pushed. Not thread-safe.
+    """
+
+    def __init__(self):
+        self._heap = list()  # [priority, seq, id, value]
+        self._index = dict()  # id: position in self._heap
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, id):
+        return id in self._index
+
+    def push(self, priority, id, value):
+        """Push a value with a priority for a unique id"""
+        if id in self._index:
+            raise KeyError("Duplicate id in IndexedHeap: {}".format(id))
+        entry = [priority, self._seq, id, value]
+        self._seq += 1
+        self._heap.append(entry)
+        self._index[id] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def peek(self):
+        """Return (priority, id, value) of the first item or None"""
+        if len(self._heap) == 0:
+            return None
+        priority, _, id, value = self._heap[0]
+        return priority, id, value
+
+    def pop(self):
+        """Remove and return (priority, id, value) of the first item"""
+        if len(self._heap) == 0:
+            raise IndexError("pop from empty IndexedHeap")
+        priority, _, id, value = self._remove_at(0)
+        return priority, id, value
+
+    def remove(self, id):
+        """Remove the item with the given id, return whether it existed"""
+        if id not in self._index:
+            return False
+        self._remove_at(self._index[id])
+        return True
+
+    def _remove_at(self, i):
+        """Remove the entry at position i and restore the heap invariant"""
+        heap = self._heap
+        entry = heap[i]
+        del self._index[entry[2]]
+        last = heap.pop()
+        if i < len(heap):
+            heap[i] = last
+            self._index[last[2]] = i
+            self._sift_up(i)
+            self._sift_down(self._index[last[2]])
+        return entry
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._index[heap[i][2]] = i
+        self._index[heap[j][2]] = j
+
+    def _sift_up(self, i):
+        heap = self._heap
+        while i > 0:
+            parent = (i - 1) // 2
+            if heap[i][:2] >= heap[parent][:2]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i):
+        heap = self._heap
+        n = len(heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and heap[child][:2] < heap[smallest][:2]:
+                    smallest = child
+            if smallest == i:
+                break
+            self._swap(i, smallest)
+            i = smallest
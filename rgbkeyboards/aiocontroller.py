@@ -0,0 +1,170 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import logging
+# Project Modules
+from rgbkeyboards.clock import to_seconds
+from rgbkeyboards.controller import BaseController
+from rgbkeyboards.frame import KeyFrame
+
+
+class AsyncKeyboardController(BaseController):
+    """
+    asyncio-native handler for Keyboard instance to manage effects
+
+    Runs on an asyncio event loop instead of in a Thread with its own
+    loop. Each tick is scheduled with loop.call_at for the earliest
+    deadline in the heap, and rescheduled when something is scheduled
+    or cancelled, so nothing runs while no commands are scheduled.
+
+    The calls to the keyboard block for the duration of the transfer
+    to the device. They are performed in a dedicated single-thread
+    executor so they do not block the event loop and are performed in
+    the order the frames were composited in.
+
+    See BaseController for the scheduling and compositing of commands
+    and the parameters. Use as asynchronous context manager:
+
+        async with AsyncKeyboardController(keyboard) as controller:
+            await controller.sched_effect(0, effect)
+
+    :param loop: Event loop to run on, defaults to the loop running
+        when the controller is started
+    """
+
+    def __init__(self, keyboard, margin=0.10, level=logging.ERROR, clock=None,
+                 fps=None, loop=None):
+        """Initialize attributes"""
+        BaseController.__init__(self, keyboard, margin, level, clock, fps)
+        self._loop = loop
+        self._executor = None
+        self._running = False
+        self._handle = None  # asyncio.TimerHandle of the next tick
+        self._wakeup = False  # Reschedule of the tick pending
+        self._in_tick = False
+
+    async def __aenter__(self):
+        """Enable control and start processing commands"""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        """Stop processing commands and disable control"""
+        await self.stop()
+
+    async def start(self):
+        """Enable control on the keyboard and schedule the first tick"""
+        if self._running:
+            return
+        if self._loop is None:
+            self._loop = asyncio.get_event_loop()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        await self._loop.run_in_executor(self._executor, self._kb.enable_control)
+        if not self._kb.is_control_enabled:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            raise RuntimeError("Could not enable keyboard LED control")
+        self._logger.debug("Claimed LED Control")
+        with self._cond:
+            self._start = self._clock.now()
+            self._running = True
+        self._schedule_tick()
+
+    async def stop(self):
+        """
+        Stop processing commands and disable control on the keyboard
+
+        Calls to the keyboard that were already submitted are performed
+        before control is disabled.
+        """
+        if not self._running:
+            return
+        with self._cond:
+            self._running = False
+            if self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+        await self._loop.run_in_executor(self._executor, self._kb.disable_control)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._logger.debug("Released LED Control")
+
+    async def sched_effect(self, *args, **kwargs):
+        """Schedule an effect, see BaseController.sched_effect"""
+        return BaseController.sched_effect(self, *args, **kwargs)
+
+    async def cancel_effect(self, effect_id):
+        """Cancel an effect, see BaseController.cancel_effect"""
+        return BaseController.cancel_effect(self, effect_id)
+
+    async def cancel_effects(self, tag):
+        """Cancel effects by tag, see BaseController.cancel_effects"""
+        return BaseController.cancel_effects(self, tag)
+
+    def _notify(self):
+        """
+        Reschedule the next tick from the event loop thread
+
+        Called with the Condition held, possibly from another thread.
+        During a tick nothing has to be done, as the next tick is
+        scheduled when the current one ends.
+        """
+        if not self._running or self._in_tick or self._wakeup:
+            return
+        self._wakeup = True
+        self._loop.call_soon_threadsafe(self._schedule_tick)
+
+    def _schedule_tick(self):
+        """Schedule the next tick at the earliest deadline"""
+        with self._cond:
+            self._wakeup = False
+            if self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+            item = self._command_queue.peek()
+            if not self._running or item is None:
+                return
+            delay = to_seconds(max(item[0] - self._now(), 0))
+            self._handle = self._loop.call_at(self._loop.time() + delay, self._tick)
+
+    def _tick(self):
+        """Process all commands that are due"""
+        self._handle = None
+        self._in_tick = True
+        try:
+            self._process_command()
+        finally:
+            self._in_tick = False
+        self._schedule_tick()
+
+    def _send(self, func, *args):
+        """
+        Perform a call to the keyboard in the executor
+
+        KeyFrames are copied into a KeyFrame from the pool first, as the
+        controller reuses its frames before the executor may have sent
+        them. The copies are released when the call is done.
+        """
+        frames = [self._pool.copy(a) for a in args if isinstance(a, KeyFrame)]
+        if len(frames) != 0:
+            args = tuple(frames)
+        future = self._loop.run_in_executor(self._executor, func, *args)
+        future.add_done_callback(self._check_result)
+        for frame in frames:
+            future.add_done_callback(lambda _, f=frame: self._pool.release(f))
+        return future
+
+    def _check_result(self, future):
+        """Log the failure of a call to the keyboard"""
+        if future.cancelled():
+            return
+        exception = future.exception()
+        if exception is not None:
+            self._logger.error("Keyboard call failed: {}".format(exception))
+        elif future.result() is False:
+            self._logger.warning("Keyboard call returned False")
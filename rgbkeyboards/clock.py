@@ -0,0 +1,94 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+import time
+
+
+NS = 1000000000
+
+
+def to_ns(seconds):
+    """Convert a period in seconds to integer nanoseconds"""
+    return int(round(seconds * NS))
+
+
+def to_seconds(ns):
+    """Convert a period in integer nanoseconds to seconds"""
+    return ns / float(NS)
+
+
+if hasattr(time, "monotonic_ns"):
+    _monotonic_ns = time.monotonic_ns
+elif hasattr(time, "monotonic"):
+    def _monotonic_ns():
+        return int(time.monotonic() * NS)
+else:  # Python 2 has no monotonic clock
+    def _monotonic_ns():
+        return int(time.time() * NS)
+
+
+class MonotonicClock(object):
+    """
+    Time source for the KeyboardController based on the monotonic clock
+
+    A clock provides the current time as integer nanoseconds and a way
+    to wait on a Condition until a given amount of nanoseconds has
+    passed. Any object providing now() and wait() may be passed to the
+    KeyboardController as a clock.
+    """
+
+    def now(self):
+        """Return the current time in integer nanoseconds"""
+        return _monotonic_ns()
+
+    def wait(self, condition, timeout=None):
+        """
+        Wait on an acquired Condition for a notification or a timeout
+        :param condition: threading.Condition that is held by the caller
+        :param timeout: Timeout in nanoseconds, None to wait forever
+        """
+        if timeout is None:
+            return condition.wait()
+        return condition.wait(to_seconds(timeout))
+
+
+class VirtualClock(MonotonicClock):
+    """
+    Manually driven clock for tests and simulations
+
+    The time only changes when advance() or set() is called. A wait
+    with a timeout does not block but advances the clock to the end of
+    the timeout instead, so a KeyboardController thread running with
+    this clock fast-forwards through its schedule. A wait without
+    timeout still blocks until the Condition is notified.
+    """
+
+    def __init__(self, start=0):
+        """
+        :param start: Initial time in nanoseconds
+        """
+        self._now = start
+
+    def now(self):
+        """Return the current virtual time in nanoseconds"""
+        return self._now
+
+    def set(self, now):
+        """Set the current virtual time in nanoseconds"""
+        if now < self._now:
+            raise ValueError("VirtualClock cannot go back in time")
+        self._now = now
+
+    def advance(self, period):
+        """Advance the virtual time by a period in seconds"""
+        self.set(self._now + to_ns(period))
+
+    def wait(self, condition, timeout=None):
+        """Advance the clock by timeout instead of blocking"""
+        if timeout is None:
+            return condition.wait()
+        self._now += timeout
+        return True
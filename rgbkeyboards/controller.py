@@ -4,32 +4,71 @@ License: GNU GPLv3
 Copyright (c) 2017-2018 RedFantom
 """
 # Standard Library
-from datetime import datetime
 import logging
-from threading import Thread
+from threading import Condition, Thread
 from time import sleep
 from warnings import warn
+from collections import namedtuple
 # Project Modules
+from rgbkeyboards.clock import MonotonicClock, to_ns, to_seconds
 from rgbkeyboards.effects import *
 from rgbkeyboards.keyboard import BaseKeyboard
-from rgbkeyboards._queue import Queue, PriorityQueue, Empty
+from rgbkeyboards.frame import FramePool
+from rgbkeyboards.layers import Layer, LayerStack, REPLACE
+from rgbkeyboards._queue import Empty
+from rgbkeyboards._heap import IndexedHeap
 
 
-class KeyboardController(Thread):
-    """
-    Thread-based handler for Keyboard instance to manage effects
+FrameStats = namedtuple("FrameStats", ["rendered", "dropped", "skipped"])
+# rendered: Amount of frames rendered in fixed-rate mode
+# dropped: Amount of frames not rendered because the loop fell behind
+# skipped: Amount of effect instructions never shown
+
+_RENDER = 0  # Heap id of the fixed-rate render tick
 
-    Because this class is Thread based, it allows running a loop so
-    the LEDs of any backend can be controlled asynchronously. All events
-    are schedules into a PriorityQueue and given a priority based on the
-    period they are supposed to execute after.
 
-    Elements with a waiting period of 0 are executed as soon as
-    possible. Effects with the same scheduled moment of execution are
-    executed in the order they were scheduled in.
+class _Playback(object):
+    """State of an effect that is scheduled or playing"""
 
-    If for some reason the KeyboardController is not able to keep up
-    with the stream of commands, the commands are skipped when they were
+    __slots__ = ("layer", "overlay", "tag", "start", "index")
+
+    def __init__(self, layer, overlay, tag):
+        self.layer = layer
+        self.overlay = overlay
+        self.tag = tag
+        self.start = None  # Priority of the first render
+        self.index = 0  # Cursor into a CompiledEffect
+
+
+class BaseController(object):
+    """
+    Scheduling and compositing core shared by the keyboard controllers
+
+    All events are scheduled into a heap and given a priority based on
+    the period they are supposed to execute after. Elements with a
+    waiting period of 0 are executed as soon as possible. Effects with
+    the same scheduled moment of execution are executed in the order
+    they were scheduled in.
+
+    All commands and effect instructions that are due in a single tick
+    are collected into one frame, which is sent to the keyboard with a
+    single call. The amount of calls to the back-end thus does not
+    depend on the amount of effects that are playing.
+
+    The frame is composited from a LayerStack. Scheduled colors are
+    written to the base layer (or the overlay layer), and every playing
+    effect is given its own layer with a blend mode and opacity. The
+    layers are composited into KeyFrames from a FramePool, so rendering
+    does not allocate new frames, and passed to the keyboard with
+    BaseKeyboard.set_frame, which only sends the keys that changed.
+
+    Subclasses run the loop: they call _process_command when the
+    earliest deadline has passed, and may override _notify to be woken
+    up when something is scheduled or cancelled, and _send to change
+    how calls to the keyboard are performed.
+
+    If for some reason the controller is not able to keep up with the
+    stream of commands, the commands are skipped when they were
     scheduled more time in the past than :param margin:.
 
     :param keyboard: Keyboard backend to control using this handler.
@@ -37,179 +76,372 @@ class KeyboardController(Thread):
         with a handler and 'manually' (that is, synchronously in
         a different thread), this is not tested and not recommended.
 
-    :param sleep: Sleeping period when there are no commands available
-        while True loops in Python consume all the CPU time they can
-        get. In order to reduce the amount of CPU time wasted on just
-        checking if there are commands, the loop can be suspended for
-        a short period. Lowering this value will have a positive effect
-        on the response time, but a negative effect on the CPU usage.
-
-    :param margin: Upper bound for execution of scheduled events
+    :param margin: Upper bound for late execution of scheduled commands
         The commands are scheduled to be executed at a certain point in
-        time (a period after the moment they were scheduled). The margin
-        is the amount of time that premature execution of commands is
-        allowed.
+        time (a period after the moment they were scheduled). Commands
+        that are picked up more than margin seconds after that point
+        are skipped. Effect instructions are never skipped.
 
-        Example (simplified with datetimes represented as ints):
+        Example (simplified with times represented in seconds):
         self._start = 0
         priority = 11  # Execution time: t = 11
         margin = 0.10
 
-        If the control loop is fast enough, it may come at a point
-        that datetime.now() = 10.95. 11 - (10.95 - 0) < margin, thus the
-        command will be executed in this cycle. See
+        If the control loop is delayed until clock.now() = 11.20,
+        11.20 - 11 > margin, thus the command is dropped. See
         _is_approximately_now for more details.
 
     :param level: Logging level for the basic Logger instance
+
+    :param clock: Time source providing now() in integer nanoseconds
+        and wait(condition, timeout). Defaults to a MonotonicClock, so
+        wall clock adjustments do not influence the schedule. Pass a
+        VirtualClock to drive the controller deterministically.
+
+    :param fps: Target frame rate for the fixed-rate render mode
+        By default, every effect instruction is executed at its own
+        deadline, so if the back-end falls behind, effects play out
+        slower than scheduled. In fixed-rate mode, all active effects
+        are rendered at the current time on a fixed grid of frames
+        instead. Frames that were missed are dropped and instructions
+        that were never shown are skipped, so a slow back-end makes the
+        effects choppier, but never slower. See the stats property.
+
+    Internally, all priorities are integer nanoseconds since the start
+    of the loop. Periods passed to the public functions are seconds.
     """
 
-    def __init__(self, keyboard, sleep=0.05, margin=0.10, level=logging.ERROR):
+    def __init__(self, keyboard, margin=0.10, level=logging.ERROR, clock=None,
+                 fps=None):
         """Initialize attributes and Logger"""
         assert isinstance(keyboard, BaseKeyboard)
         self._kb = keyboard
-        self._exit_queue = Queue()
-        self._command_queue = PriorityQueue()
+        self._cond = Condition()
+        self._command_queue = IndexedHeap()
         self._start = None
-        self._sleep = sleep
-        self._margin = margin
-        self._stale = list()
-        self._stale_queue = Queue()
-        self._effect_queue = Queue()
+        self._margin = to_ns(margin)
+        self._clock = clock if clock is not None else MonotonicClock()
+        self._stale = set()  # Cancelled effects with a layer to remove
         self._effects = dict()
+        self._tags = dict()
+        self._layers = LayerStack()
+        self._pool = FramePool()
+        self._last_frame = self._pool.acquire()
         self._id = 1
+        self._period = to_ns(1.0 / fps) if fps else None
+        self._active = dict()  # Effects rendered in fixed-rate mode
+        self._stats = FrameStats(0, 0, 0)
 
-        self._logger = logging.getLogger("KeyboardController")
+        self._logger = logging.getLogger(self.__class__.__name__)
         self._logger.setLevel(level)
 
-        Thread.__init__(self)
-
-    def run(self):
-        """
-        Run the keyboard control loop
-
-        Run a loop to process commands put into the internal queue.
-        Exits the loop when the function stop() is called.
-        """
-        self._start = datetime.now()
-        with self._kb:  # Enables control
-            if not self._kb.is_control_enabled:
-                raise RuntimeError("Could not enable keyboard LED control")
-            self._logger.debug("Claimed LED Control")
-            while True:
-                if self.get_queue_item(self._exit_queue) is not None:
-                    break
-                self._check_effects()
-                self._process_command()
-        self._logger.debug("Loop end")
-        if self._kb.is_control_enabled:
-            warn("Keyboard control not properly disabled", RuntimeWarning)
+    def _pop_due(self, now):
+        """Pop the earliest command from the heap if it is due at now"""
+        with self._cond:
+            item = self._command_queue.peek()
+            if item is None or item[0] > now:
+                return None
+            return self._command_queue.pop()
+
+    def _push(self, priority, id, command):
+        """Push a command onto the heap and wake up the loop"""
+        with self._cond:
+            self._command_queue.push(priority, id, command)
+            self._notify()
+
+    def _notify(self):
+        """Wake up the loop to re-evaluate the earliest deadline"""
+        self._cond.notify()
+
+    def _send(self, func, *args):
+        """Perform a call to the keyboard"""
+        return func(*args)
+
+    def _next_id(self):
+        """Return a new unique id for a command or effect"""
+        with self._cond:
+            id = self._id
+            self._id += 1
+            return id
 
-    def _check_effects(self):
-        """Check for scheduled and cancelled Effects"""
-        item = self.get_queue_item(self._stale_queue)
-        while item is not None:
-            self._stale.append(item)
-            item = self. get_queue_item(self._stale_queue)
-        item = self.get_queue_item(self._effect_queue)
+    def _process_command(self):
+        """Execute all commands that are due and commit the frame"""
+        with self._cond:
+            stale, self._stale = self._stale, set()
+        for id in stale:
+            self._layers.remove(id)
+        now = self._now()
+        item = self._pop_due(now)
         while item is not None:
-            priority, id, effect = item
-            if not isinstance(effect, Effect):
-                # TODO: How can the (None, Effect) end up in the _effect_queue?
-                return
-            self._effects[id] = None
-            item = (priority, id, (None, effect))
-            self._command_queue.put(item)
-
-    @staticmethod
-    def get_queue_item(queue):
-        """Safely retrieve an item from a given queue"""
-        if queue.empty() is True:
+            priority, id, (func, args) = item
+            if func == self._exec_effect_instr:
+                self._exec_effect_instr(priority, id, args)
+            elif func == self._render:
+                self._render(priority)
+            elif not self._is_approximately_now(priority):
+                self._logger.debug("Skipping late command: {}, {}(*{})".format(
+                    priority, func, args))
+            else:
+                self._logger.debug("Processing a single command: {}, {}(*{})".format(
+                    priority, func, args))
+                func(*args)
+            item = self._pop_due(now)
+        self._commit_frame()
+
+    def _commit_frame(self):
+        """Composite the layers and send the changed keys in one call"""
+        if not self._layers.dirty:
             return None
-        try:
-            return queue.get()
-        except Empty:
+        frame = self._layers.composite(self._pool.acquire())
+        if frame == self._last_frame:
+            self._pool.release(frame)
             return None
-
-    def _process_command(self):
-        """Get a single command from the PriorityQueue and execute"""
-        item = self.get_queue_item(self._command_queue)
-        if item is None:
-            sleep(self._sleep)
-            return
-        priority, id, (func, args) = item
-        if not self._is_approximately_now(priority):
-            self._command_queue.put(item)
-            return
-        if id in self._effects:
-            self._exec_effect_instr(priority, id, args)
-            return
-        self._logger.debug("Processing a single command: {}, {}(*{})".format(
-            priority, func, args))
-        func(*args)
+        self._pool.release(self._last_frame)
+        self._last_frame = frame
+        return self._send(self._kb.set_frame, frame)
 
     def _exec_effect_instr(self, priority, id, effect):
         """Execute a single effect instruction from an effect"""
-        assert isinstance(effect, Effect)
-        if id in self._stale:
-            # Effect has been cancelled, cleanup
-            del self._effects[id]
-            return  # Not in Queue anymore
-        if self._effects[id] is None:
-            self._effects[id] = datetime.now()
-        if len(effect.instr) == 0:  # Effect has ended
-            del self._effects[id]
+        assert isinstance(effect, (CompiledEffect, LazyEffect))
+        playback = self._effects.get(id)
+        if playback is None:  # Cancelled while executing
+            return
+        if playback.start is None:  # First instruction
+            playback.start = priority
+            self._layers.add(id, playback.layer, playback.overlay)
+            if self._period is not None:
+                return self._activate(priority, id, effect)
+        if isinstance(effect, LazyEffect):
+            return self._exec_lazy_effect(priority, id, effect, playback)
+        if playback.index >= len(effect):  # Effect has ended
+            self._end_effect(id, effect)
             return  # Not rescheduled
         # Retrieve the next instruction
-        instr = effect.instr.pop(0)
-        assert isinstance(instr, Instruction)
-        # Execute instruction
-        if instr.key is ALL_KEYS:
-            self._kb.set_full_color(*instr.color)
-        elif isinstance(instr.key, str):
-            self._kb.set_ind_color({instr.key: instr.color})
-        else:
-            arg = {key: instr.color for key in instr.key}
-            self._kb.set_ind_color(arg)
+        instr = effect[playback.index]
+        playback.index += 1
+        self._write(playback.layer, instr.key, instr.color)
         # Schedule next instruction
-        item = (priority + instr.duration, id, (self._exec_effect_instr, effect))
-        self._command_queue.put(item)
+        self._reschedule(priority + to_ns(instr.duration), id, effect)
 
-    def stop(self):
-        """Stop the running thread"""
-        if not self.is_alive():
-            return
-        self._exit_queue.put(True)
-
-    def sched_effect(self, after, effect):
-        """Schedule an Effect for playing"""
-        after = (datetime.now() - self._start).total_seconds() + after
-        effect_id = self._id
-        self._effect_queue.put((after, effect_id, effect))
-        self._id += 1
+    def _exec_lazy_effect(self, priority, id, effect, playback):
+        """
+        Render a LazyEffect at the time elapsed since its start
+
+        If the loop has fallen behind, the effect is rendered at the
+        current time instead of rendering all the frames that were
+        missed one by one.
+        """
+        priority = max(priority, self._now())
+        elapsed = to_seconds(priority - playback.start)
+        if elapsed > effect.duration:  # Effect has ended
+            self._end_effect(id, effect)
+            return  # Not rescheduled
+        self._write(playback.layer, effect.keys, effect.color(elapsed))
+        self._reschedule(priority + to_ns(effect.interval), id, effect)
+
+    @staticmethod
+    def _write(layer, keys, color):
+        """Write a color for a selection of keys into a layer"""
+        if keys is ALL_KEYS:
+            layer.set_full_color(*color)
+        elif isinstance(keys, str):
+            layer.set_ind_color({keys: color})
+        else:
+            layer.set_ind_color({key: color for key in keys})
+
+    def _activate(self, priority, id, effect):
+        """Start rendering an effect in fixed-rate mode"""
+        self._active[id] = effect
+        if len(self._active) == 1:  # Render tick was not scheduled
+            self._push(priority, _RENDER, (self._render, None))
+
+    def _render(self, priority):
+        """
+        Render all active effects at the current time
+
+        Part of the fixed-rate mode. Renders a frame and schedules the
+        next frame on the grid of frames. If the loop has fallen behind
+        more than a frame period, the missed frames are dropped. The
+        render tick is not rescheduled if no effects are active.
+        """
+        now = self._now()
+        rendered, dropped, skipped = self._stats
+        for id, effect in list(self._active.items()):
+            playback = self._effects.get(id)
+            if playback is None:  # Cancelled
+                del self._active[id]
+                continue
+            elapsed = to_seconds(now - playback.start)
+            if isinstance(effect, LazyEffect):
+                if elapsed > effect.duration:
+                    del self._active[id]
+                    self._end_effect(id, effect)
+                    continue
+                self._write(playback.layer, effect.keys, effect.color(elapsed))
+                continue
+            index = effect.index_at(elapsed)
+            if index is None:
+                skipped += len(effect) - playback.index
+                del self._active[id]
+                self._end_effect(id, effect)
+                continue
+            if index < playback.index:  # Instruction already shown
+                continue
+            skipped += index - playback.index
+            playback.index = index + 1
+            instr = effect[index]
+            self._write(playback.layer, instr.key, instr.color)
+        rendered += 1
+        if len(self._active) != 0:
+            priority += self._period
+            if priority <= now:
+                missed = (now - priority) // self._period + 1
+                dropped += missed
+                priority += missed * self._period
+            self._push(priority, _RENDER, (self._render, None))
+        self._stats = FrameStats(rendered, dropped, skipped)
+
+    @property
+    def stats(self):
+        """FrameStats of the fixed-rate render mode"""
+        return self._stats
+
+    def _reschedule(self, priority, id, effect):
+        """Push the next render of an effect unless it was cancelled"""
+        with self._cond:
+            if id in self._effects:
+                self._push(priority, id, (self._exec_effect_instr, effect))
+
+    def _end_effect(self, id, effect):
+        """
+        Remove a finished effect and its layer
+
+        The keys keep the colors a REPLACE effect outside of the overlay
+        group ended with, as its final colors are copied into the base
+        layer. Instructions skipped by the fixed-rate render mode are
+        applied first, and a LazyEffect is rendered at its duration.
+        """
+        with self._cond:
+            playback = self._effects.get(id)
+            self._forget_effect(id)
+        if playback is not None and not playback.overlay and \
+                playback.layer.blend == REPLACE:
+            if isinstance(effect, LazyEffect):
+                self._write(playback.layer, effect.keys, effect.color(effect.duration))
+            else:
+                for index in range(playback.index, len(effect)):
+                    instr = effect[index]
+                    self._write(playback.layer, instr.key, instr.color)
+            self._layers.base.merge(playback.layer)
+        self._layers.remove(id)
+
+    def _forget_effect(self, id):
+        """Remove an effect from the heap and the administration"""
+        playback = self._effects.pop(id, None)
+        if playback is None:
+            return False
+        self._command_queue.remove(id)
+        if playback.tag is not None:
+            ids = self._tags[playback.tag]
+            ids.discard(id)
+            if len(ids) == 0:
+                del self._tags[playback.tag]
+        return True
+
+    def sched_effect(self, after, effect, blend=REPLACE, opacity=1.0,
+                     overlay=False, tag=None):
+        """
+        Schedule an Effect, CompiledEffect or LazyEffect for playing
+
+        The Effect is rendered into its own Layer, which is placed on
+        top of the effects already playing when it starts. A LazyEffect
+        is rendered on the fly at the time elapsed since its start, so
+        scheduling it costs the same regardless of its duration. When a
+        REPLACE effect outside of the overlay group ends, the keys keep
+        its final colors, other effects only last while they play.
+
+        An Effect is compiled before it is scheduled and is not
+        modified, so it may be scheduled again. A CompiledEffect may be
+        scheduled any amount of times, also concurrently.
+        :param blend: Blend mode of the effect layer
+        :param opacity: Opacity of the effect layer
+        :param overlay: Place the layer in the overlay group, above all
+            regular effect layers
+        :param tag: Hashable tag to cancel related effects together
+            with cancel_effects
+        :return: int effect id
+        """
+        assert isinstance(effect, (Effect, CompiledEffect, LazyEffect))
+        if self._start is None:
+            raise RuntimeError("{} has not started".format(
+                self.__class__.__name__))
+        after = self._now() + to_ns(after)
+        if isinstance(effect, Effect):
+            effect = compile_effect(effect)
+        layer = Layer(effect.name, blend, opacity)
+        with self._cond:
+            effect_id = self._next_id()
+            self._effects[effect_id] = _Playback(layer, overlay, tag)
+            if tag is not None:
+                self._tags.setdefault(tag, set()).add(effect_id)
+            self._push(after, effect_id, (self._exec_effect_instr, effect))
         return effect_id
 
     def cancel_effect(self, effect_id):
-        """Cancel the scheduling of an effect or an active effect"""
-        self._stale_queue.put(effect_id)
+        """
+        Cancel the scheduling of an effect or an active effect
 
-    def set_full_color(self, after, color):
+        The effect is removed from the heap immediately. The layer of
+        an active effect is removed in the next tick.
+        :return: bool, whether the effect was scheduled or active
+        """
+        with self._cond:
+            if not self._forget_effect(effect_id):
+                return False
+            self._stale.add(effect_id)
+            self._notify()
+        return True
+
+    def cancel_effects(self, tag):
+        """
+        Cancel all effects scheduled with a given tag
+        :return: int amount of effects cancelled
+        """
+        with self._cond:
+            ids = list(self._tags.get(tag, ()))
+            for effect_id in ids:
+                self.cancel_effect(effect_id)
+        return len(ids)
+
+    def set_full_color(self, after, color, overlay=False):
         """Schedule set the color of all the LEDs on the keyboard"""
         assert isinstance(after, int), "after paramaeter must be int ms"
         assert isinstance(color, tuple) and len(color) == 3, \
             "color parameter must be valid color tuple"
-        self._after(self._kb.set_full_color, color, after)
+        layer = self._layers.overlay if overlay else self._layers.base
+        self._after(layer.set_full_color, color, after)
 
-    def set_ind_color(self, after, leds):
+    def set_ind_color(self, after, leds, overlay=False):
         """Schedule set the color of the individual LEDs"""
         assert isinstance(leds, dict)
-        self._after(self._kb.set_ind_color, (leds,), after)
+        layer = self._layers.overlay if overlay else self._layers.base
+        self._after(layer.set_ind_color, (leds,), after)
+
+    def clear_overlay(self, after):
+        """Schedule clearing the overlay layer"""
+        self._after(self._layers.overlay.clear, (), after)
+
+    @property
+    def layers(self):
+        """LayerStack the frames are composited from"""
+        return self._layers
 
     def _after(self, func, args, period):
         """
         Schedule an action to be performed after int: period seconds
 
-        Puts a function with its arguments into a reverse PriorityQueue.
-        The priority is determined as the sum of the amount of seconds
+        Pushes a function with its arguments onto the heap of commands.
+        The priority is determined as the sum of the amount of nanoseconds
         since the start of taking commands and the period in which
         the command given should be executed (a longer period results
         in a higher priority number and thus later execution).
@@ -217,14 +449,107 @@ class KeyboardController(Thread):
         self._logger.debug("Scheduling new task: {}(*{}) {} seconds from now".format(
             func, args, period))
         if self._start is None:
-            raise RuntimeError("KeyboardController has not started")
-        priority = (datetime.now() - self._start).total_seconds() + period
-        self._command_queue.put((priority, 0, (func, args)))
+            raise RuntimeError("{} has not started".format(
+                self.__class__.__name__))
+        priority = self._now() + to_ns(period)
+        self._push(priority, self._next_id(), (func, args))
+
+    def _now(self):
+        """Return the amount of nanoseconds since the start of the loop"""
+        return self._clock.now() - self._start
+
+    def _is_approximately_now(self, ns):
+        """Determines if the amount of nanoseconds has passed within margin"""
+        return self._now() - ns < self._margin
+
+
+class KeyboardController(BaseController, Thread):
+    """
+    Thread-based handler for Keyboard instance to manage effects
+
+    Because this class is Thread based, it allows running a loop so
+    the LEDs of any backend can be controlled asynchronously. See
+    BaseController for the scheduling and compositing of commands and
+    for the other parameters.
+
+    The loop sleeps on a Condition until the earliest scheduled
+    deadline. Scheduling or cancelling anything notifies the Condition,
+    so the loop wakes up immediately for new commands and does not
+    wake up at all while nothing is scheduled.
+
+    :param sleep: Deprecated, no longer used
+        The loop used to be suspended for this period when no commands
+        were available. It now waits for the next deadline instead.
+        The parameter is kept for backwards compatibility.
+    """
+
+    def __init__(self, keyboard, sleep=0.05, margin=0.10, level=logging.ERROR,
+                 clock=None, fps=None):
+        """Initialize attributes and Thread"""
+        BaseController.__init__(self, keyboard, margin, level, clock, fps)
+        self._exit = False
+        self._sleep = sleep
+        Thread.__init__(self)
+
+    def run(self):
+        """
+        Run the keyboard control loop
 
-    def _is_approximately_now(self, seconds):
-        """Determines if the amount of seconds has approximately passed"""
-        diff = abs(seconds - (datetime.now() - self._start).total_seconds())
-        return diff < self._margin
+        Run a loop to process commands put into the internal queue.
+        Exits the loop when the function stop() is called.
+        """
+        self._start = self._clock.now()
+        with self._kb:  # Enables control
+            if not self._kb.is_control_enabled:
+                raise RuntimeError("Could not enable keyboard LED control")
+            self._logger.debug("Claimed LED Control")
+            while self._wait_for_command():
+                self._process_command()
+        self._logger.debug("Loop end")
+        if self._kb.is_control_enabled:
+            warn("Keyboard control not properly disabled", RuntimeWarning)
+
+    def _wait_for_command(self):
+        """
+        Block until the earliest command is due or the loop must exit
+
+        Waits on the Condition with a timeout equal to the time left
+        until the earliest deadline, or without timeout if the queue is
+        empty. Any submission notifies the Condition, upon which the
+        deadline is re-evaluated. Cancelled effects wake up the loop
+        so their layers are removed immediately.
+        :return: False if the loop should exit, True otherwise
+        """
+        with self._cond:
+            while not self._exit:
+                if len(self._stale) != 0:
+                    return True
+                if len(self._command_queue) == 0:
+                    self._clock.wait(self._cond)
+                    continue
+                timeout = self._command_queue.peek()[0] - self._now()
+                if timeout <= 0:
+                    return True
+                self._clock.wait(self._cond, timeout)
+            return False
+
+    @staticmethod
+    def get_queue_item(queue):
+        """Safely retrieve an item from a given queue"""
+        if queue.empty() is True:
+            return None
+        try:
+            return queue.get()
+        except Empty:
+            return None
+
+    def stop(self):
+        """Stop the running thread"""
+        if not self.is_alive():
+            return
+        with self._cond:
+            self._exit = True
+            self._cond.notify()
 
     """
     Manual loop interface
@@ -237,8 +562,8 @@ class KeyboardController(Thread):
     second) and use close() when the loop ends to make sure that
     everything is cleaned up nicely.
     
-    To not make the update() function slow down your main program, make
-    sure to use a sleep time of zero when initializing the class.
+    The update() function never blocks: it only executes the commands
+    that are due at the moment it is called.
     """
 
     def update(self):
@@ -250,8 +575,8 @@ class KeyboardController(Thread):
             r = self._kb.enable_control()
             if r is False:
                 raise RuntimeError("Could not enable keyboard LED control")
-            self._start = datetime.now()
-        self._check_effects()
+        if self._start is None:
+            self._start = self._clock.now()
         self._process_command()
 
     def close(self):
@@ -4,51 +4,253 @@ License: GNU GPLv3
 Copyright (c) 2017-2018 RedFantom
 """
 # Standard Library
-from collections import namedtuple
+from array import array
+from bisect import bisect_right
+from collections import namedtuple, OrderedDict
+from functools import wraps
+from threading import Lock
 
 ALL_KEYS = None
 
 OFF = (0, 0, 0)
 
+CACHE_SIZE = 128
+
 
 Effect = namedtuple("Effect", ["name", "instr"])
 # name: Name of the effect for debugging
 # instr: List of Instructions to execute
 # repeat: None or int, amount of times to repeat effect, 0: until cancelled
 Instruction = namedtuple("Instruction", ["color", "key", "duration"])
+LazyEffect = namedtuple(
+    "LazyEffect", ["name", "color", "duration", "keys", "interval"])
+# name: Name of the effect for debugging
+# color: Function of the elapsed time in seconds returning a color tuple
+# duration: Length of the effect in seconds
+# keys: Keys to apply the color to, str, list of str or ALL_KEYS
+# interval: Period in seconds between two renders of the effect
+
+
+class CompiledEffect(object):
+    """
+    Compact, immutable representation of an Effect
+
+    The Instructions of an Effect are stored in contiguous buffers: a
+    bytes object with three color bytes per Instruction, an array of
+    indices into a tuple of the distinct key selections and an array of
+    durations. A CompiledEffect is never modified while it is played,
+    so a single instance can be shared by any amount of concurrent
+    playbacks, each keeping its own position in the effect.
+    """
+
+    __slots__ = ("name", "_colors", "_masks", "_keys", "_durations", "_starts")
+
+    def __init__(self, name, colors, masks, keys, durations):
+        self.name = name
+        self._colors = bytes(colors)
+        self._masks = array("H", masks)
+        self._keys = tuple(keys)
+        self._durations = array("d", durations)
+        self._starts = array("d")  # Offset of each Instruction in seconds
+        t = 0.0
+        for duration in self._durations:
+            self._starts.append(t)
+            t += duration
+
+    def __len__(self):
+        return len(self._durations)
+
+    def __getitem__(self, i):
+        """Return the Instruction at index i"""
+        j = 3 * i
+        color = tuple(bytearray(self._colors[j:j + 3]))
+        return Instruction(color, self._keys[self._masks[i]], self._durations[i])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def duration(self):
+        """Total duration of the effect in seconds"""
+        if len(self) == 0:
+            return 0.0
+        return self._starts[-1] + self._durations[-1]
+
+    def index_at(self, elapsed):
+        """
+        Return the index of the Instruction active at an elapsed time
+
+        :param elapsed: Time since the start of the effect in seconds
+        :return: int index, or None if the effect has ended
+        """
+        if elapsed >= self.duration:
+            return None
+        return max(bisect_right(self._starts, elapsed) - 1, 0)
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class LRUCache(object):
+    """
+    Thread-safe cache that discards the least recently used entries
+
+    :param maxsize: Maximum amount of entries kept in the cache. May be
+        changed on an existing cache to resize it.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, build):
+        """Return the value for key, calling build() on a cache miss"""
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                value = self._data.pop(key)
+                self._data[key] = value  # Move to most recently used
+                return value
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > max(self.maxsize, 0):
+                self._data.popitem(last=False)
+        return value
+
+    def info(self):
+        """Return a CacheInfo of the counters and the size"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
 
 
+def _hashable(value):
+    """Convert lists and sets in builder arguments for use as a key"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_hashable(v) for v in value)
+    return value
+
+
+def memoize(func):
+    """
+    Cache the CompiledEffects returned by an effect builder
+
+    Effects built with the same arguments are returned as the same
+    shared CompiledEffect instance. Effects built with arguments that
+    cannot be hashed are not cached. The LRUCache is available as the
+    cache attribute of the decorated function, along with cache_info
+    and cache_clear functions.
+    """
+    cache = LRUCache()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (_hashable(args), _hashable(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+        return cache.get(key, lambda: func(*args, **kwargs))
+
+    wrapper.cache = cache
+    wrapper.cache_info = cache.info
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
+
+def compile_effect(effect):
+    # (Effect) -> CompiledEffect
+    """Compile an Effect without modifying its list of Instructions"""
+    if isinstance(effect, CompiledEffect):  # Already compiled
+        return effect
+    colors, masks, keys, durations = bytearray(), list(), list(), list()
+    indices = dict()
+    for instr in effect.instr:
+        key = instr.key
+        if key is not ALL_KEYS and not isinstance(key, str):
+            key = tuple(key)  # Any iterable of keys, such as a list or set
+        if key not in indices:
+            indices[key] = len(keys)
+            keys.append(key)
+        colors.extend(instr.color)
+        masks.append(indices[key])
+        durations.append(instr.duration)
+    return CompiledEffect(effect.name, colors, masks, keys, durations)
+
+
+def breathe_color(c, d):
+    # (tuple[int], float) -> callable
+    """Return a function of time for the color of a breathe effect"""
+    def color(t):
+        frac = abs((t - d / 2) / (d / 2))
+        return tuple(int(v - frac * v) for v in c)
+    return color
+
+
+def transition_color(s, g, d):
+    # (tuple[int], tuple[int], float) -> callable
+    """Return a function of time for the color of a transition effect"""
+    def color(t):
+        frac = abs((t - d) / d)
+        return tuple(int(s[i] + (g[i] - s[i]) * frac) for i in range(3))
+    return color
+
+
+@memoize
 def build_flash(color, duration, keys=ALL_KEYS):
-    # (tuple[int], float) -> Effect
+    # (tuple[int], float) -> CompiledEffect
     """Create an Effect that flashes the keyboard in a single color"""
     instr = [
         Instruction(color, keys, duration),
         Instruction(OFF, keys, 0)
     ]
-    return Effect("flash", instr)
+    return compile_effect(Effect("flash", instr))
 
 
+@memoize
 def build_breathe(c, d, keys=ALL_KEYS, r=0.01):
-    # (tuple[int], float, (list[str], str, ALL_KEYS), float) -> Effect
+    # (tuple[int], float, (list[str], str, ALL_KEYS), float) -> CompiledEffect
     """Build a breathe effect with a given resolution"""
     t = 0
+    color = breathe_color(c, d)
     effect = Effect("breathe", [])
     while t <= d:
-        frac = abs((t - d / 2) / (d / 2))
-        color = tuple(int(v - frac * v) for v in c)
-        effect.instr.append(Instruction(color, keys, r))
+        effect.instr.append(Instruction(color(t), keys, r))
         t += r
-    return effect
+    return compile_effect(effect)
 
 
+@memoize
 def build_transition(s, g, d, keys=ALL_KEYS, r=0.01):
-    # (tuple[int], tuple[int], float, (list[str], str, ALL_KEYS), float -> Effect
+    # (tuple[int], tuple[int], float, (list[str], str, ALL_KEYS), float -> CompiledEffect
     """Build an effect to transition from one color to another"""
     t = 0
+    color = transition_color(s, g, d)
     effect = Effect("transition", [])
     while t <= d:
-        frac = abs((t - d) / d)
-        color = tuple(int(s[i] + (g[i] - s[i]) * frac) for i in range(3))
-        effect.instr.append(Instruction(color, keys, r))
+        effect.instr.append(Instruction(color(t), keys, r))
         t += r
-    return effect
+    return compile_effect(effect)
+
+
+def lazy_breathe(c, d, keys=ALL_KEYS, r=0.01):
+    # (tuple[int], float, (list[str], str, ALL_KEYS), float) -> LazyEffect
+    """Build a breathe effect that is rendered while it is playing"""
+    return LazyEffect("breathe", breathe_color(c, d), d, keys, r)
+
+
+def lazy_transition(s, g, d, keys=ALL_KEYS, r=0.01):
+    # (tuple[int], tuple[int], float, (list[str], str, ALL_KEYS), float -> LazyEffect
+    """Build a transition effect that is rendered while it is playing"""
+    return LazyEffect("transition", transition_color(s, g, d), d, keys, r)
@@ -0,0 +1,137 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+from threading import Lock
+# Project Modules
+from rgbkeyboards import keygroups
+
+# Keys in a KeyFrame are ordered by their id in the key registry
+KEYS = keygroups.key_names
+INDICES = keygroups.key_ids
+
+_ZEROS = bytes(bytearray(3 * len(KEYS)))
+
+
+class KeyFrame(object):
+    """
+    Colors of all keys of a keyboard in a single buffer
+
+    The colors are stored in a bytearray with three bytes (r, g, b) per
+    key, in the order of KEYS. A KeyFrame can be passed to
+    BaseKeyboard.set_frame, which does not validate the individual
+    keys, and KeyFrames can be reused through a FramePool so rendering
+    frames does not allocate new buffers.
+    """
+
+    __slots__ = ("buffer",)
+
+    def __init__(self, colors=None):
+        """
+        :param colors: Optional dictionary {keyname: (r, g, b)} to
+            initialize the frame with. All other keys are off.
+        """
+        self.buffer = bytearray(_ZEROS)
+        if colors is not None:
+            self.update(colors)
+
+    def __len__(self):
+        return len(KEYS)
+
+    def __eq__(self, other):
+        return isinstance(other, KeyFrame) and self.buffer == other.buffer
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __getitem__(self, key):
+        """Return the color tuple of a key"""
+        i = 3 * INDICES[key]
+        return tuple(self.buffer[i:i + 3])
+
+    def __setitem__(self, key, color):
+        """Set the color of a key"""
+        i = 3 * INDICES[key]
+        self.buffer[i:i + 3] = bytearray(color)
+
+    def update(self, colors):
+        """Set the colors of keys from a dictionary {keyname: (r, g, b)}"""
+        for key, color in colors.items():
+            self[key] = color
+
+    def fill(self, r, g, b):
+        """Set all keys to a single color"""
+        buf = self.buffer
+        buf[0:3] = bytearray((r, g, b))
+        n, size = 3, len(buf)
+        while n < size:  # Double the filled part until the end
+            buf[n:2 * n] = buf[0:min(n, size - n)]
+            n *= 2
+
+    def clear(self):
+        """Turn off all keys"""
+        self.buffer[:] = _ZEROS
+
+    def copy_from(self, other):
+        """Copy the colors of another KeyFrame into this one"""
+        self.buffer[:] = other.buffer
+
+    def copy(self):
+        """Return a new KeyFrame with the same colors"""
+        frame = KeyFrame()
+        frame.copy_from(self)
+        return frame
+
+    def uniform(self):
+        """Return the color of all keys if they are equal, else None"""
+        view = memoryview(self.buffer)
+        if view[3:] == view[:-3]:  # Buffer repeats with a period of a key
+            return tuple(self.buffer[0:3])
+        return None
+
+    def items(self):
+        """Iterate over (keyname, (r, g, b)) of all keys"""
+        buf = self.buffer
+        return ((key, tuple(buf[3 * i:3 * i + 3])) for i, key in enumerate(KEYS))
+
+    def to_dict(self):
+        """Return the colors as dictionary {keyname: (r, g, b)}"""
+        return dict(self.items())
+
+
+class FramePool(object):
+    """
+    Thread-safe pool of KeyFrames for reuse
+
+    :param size: Maximum amount of released KeyFrames kept for reuse
+    """
+
+    def __init__(self, size=4):
+        self._size = size
+        self._frames = list()
+        self._lock = Lock()
+
+    def acquire(self):
+        """Return a KeyFrame from the pool, or a new one if it is empty"""
+        with self._lock:
+            if len(self._frames) != 0:
+                return self._frames.pop()
+        return KeyFrame()
+
+    def release(self, frame):
+        """Return a KeyFrame to the pool once it is no longer used"""
+        if frame is None:
+            return
+        with self._lock:
+            if len(self._frames) < self._size:
+                self._frames.append(frame)
+
+    def copy(self, frame):
+        """Return a KeyFrame from the pool with the colors of frame"""
+        copy = self.acquire()
+        copy.copy_from(frame)
+        return copy
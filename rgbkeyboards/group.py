@@ -0,0 +1,93 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+from concurrent.futures import ThreadPoolExecutor
+# Project Modules
+from rgbkeyboards.keyboard import BaseKeyboard
+
+
+class KeyboardGroup(BaseKeyboard):
+    """
+    Set of keyboards controlled as a single keyboard
+
+    Implements the BaseKeyboard interface by dispatching every call to
+    all member keyboards in parallel on a thread pool, so a frame takes
+    as long as the slowest member instead of the sum of all members.
+    A call succeeds only if it succeeds for all members.
+
+    Every member keeps its own cache of committed colors, so each only
+    receives the keys that changed for that keyboard. Use as keyboard
+    for a KeyboardController to run effects on all members at once:
+
+        group = KeyboardGroup(Keyboards().keyboards())
+        controller = KeyboardController(group)
+    """
+
+    def _setup_lib(self, keyboards, workers=None):
+        """
+        :param keyboards: List of BaseKeyboard instances
+        :param workers: Amount of threads in the pool, defaults to the
+            amount of keyboards
+        """
+        self._members = list(keyboards)
+        self._pool = ThreadPoolExecutor(max_workers=workers or max(len(self._members), 1))
+
+    @property
+    def members(self):
+        """List of the member keyboards"""
+        return list(self._members)
+
+    def close(self):
+        """Shut down the thread pool once the group is no longer used"""
+        self._pool.shutdown(wait=True)
+
+    def _fan_out(self, func, *args):
+        """Call func(keyboard, *args) for all members in parallel"""
+        if len(self._members) == 1:
+            return [func(self._members[0], *args)]
+        futures = [self._pool.submit(func, keyboard, *args) for keyboard in self._members]
+        return [future.result() for future in futures]
+
+    def _get_device_available(self):
+        """Return whether a device is available for every member"""
+        return all(self._fan_out(BaseKeyboard.get_device_available))
+
+    def _enable_control(self):
+        """Enable control on all members, or on none if any fails"""
+        results = self._fan_out(BaseKeyboard.enable_control)
+        if all(r is True for r in results):
+            return True
+        self._fan_out(BaseKeyboard.disable_control)
+        return False
+
+    def _disable_control(self):
+        """Disable control on all members"""
+        return all(r is True for r in self._fan_out(BaseKeyboard.disable_control))
+
+    def _set_full_color(self, r, g, b):
+        """Set the color of all LEDs of all members"""
+        return all(result is not False for result in
+                   self._fan_out(BaseKeyboard.set_full_color, r, g, b))
+
+    def _set_ind_color(self, keys):
+        """Set the color of individual keys of all members"""
+        return all(result is not False for result in
+                   self._fan_out(BaseKeyboard.set_ind_color, keys))
+
+    def _set_frame(self, frame, indices):
+        """
+        Set the colors of a KeyFrame on all members
+
+        The members determine the keys that changed for themselves, so
+        indices is not used. The frame is only read by the members.
+        """
+        return all(result is not False for result in
+                   self._fan_out(BaseKeyboard.set_frame, frame))
+
+    @staticmethod
+    def is_product_supported(product, inventory=None):
+        """A group is not a back-end and supports no product itself"""
+        return False
@@ -4,8 +4,13 @@ License: GNU GPLv3
 Copyright (c) 2017-2018 RedFantom
 """
 # Standard Library
-from threading import Lock
-from rgbkeyboards._queue import Queue
+import logging
+from threading import Condition, Lock, Thread
+# Project Modules
+from rgbkeyboards.frame import FramePool, KeyFrame, KEYS, INDICES
+
+_ALL_KNOWN = b"\x01" * len(KEYS)
+_NONE_KNOWN = b"\x00" * len(KEYS)
 
 
 class BaseKeyboard(object):
@@ -16,6 +21,23 @@ class BaseKeyboard(object):
         enabled. Should only be set after successfully enabling keyboard
         control, so only after error checking.
 
+    The last color committed to every key is kept in a cache. Only the
+    keys that change color are passed on to the back-end, and calls that
+    would not change any key are not passed on at all. The cache is
+    cleared when control is enabled and for the keys of a failed call,
+    as their state is unknown. Use invalidate_frame if the colors of the
+    keyboard were changed by anything other than this instance.
+
+    By default, the set functions block until the back-end has sent the
+    colors to the device. After start_writer, they instead post the
+    colors to a single-slot mailbox and return True immediately. A
+    writer Thread sends the contents of the mailbox. Colors posted
+    before the writer took the previous ones are merged into the
+    unsent update, with newer colors replacing older ones for the same
+    keys, so producers never block and the device always receives the
+    latest state. Failures of the back-end are then only visible in
+    the logs and as keys with unknown color.
+
     Note that type checking on the arguments of all functions is done
     using assertions. This means that they are stripped out if
     Python is run with the -O flag, saving a little bit of execution
@@ -24,8 +46,19 @@ class BaseKeyboard(object):
     def __init__(self, *args):
         """Initialize attributes and properties"""
         self._lock = Lock()
-        self._effect_queue = Queue()
         self._control = False
+        self._writer = None  # Writer Thread in asynchronous mode
+        self._generation = 0  # Incremented when the writer is replaced
+        self._mailbox = Condition(Lock())
+        self._mail_frame = None  # KeyFrame with the colors of all keys
+        self._mail_keys = dict()  # Colors of individual keys
+        self._writing = False  # Writer is sending the previous update
+        self._frames = FramePool(2)
+        self._committed = KeyFrame()  # Last color committed to every key
+        self._known = bytearray(_NONE_KNOWN)  # Whether that color is known
+        self._invalidate = False  # Requested by _request_invalidate
+        self._sent = 0
+        self._suppressed = 0
         # Back-end defined
         self._setup_lib(*args)
 
@@ -38,12 +71,14 @@ class BaseKeyboard(object):
         r = self._exec_func(self._enable_control)
         if r is True:
             self._control = True
+            self.invalidate_frame()
         return r
 
     def disable_control(self):
         """Disable control on the controlled keyboard"""
         if self._control is False:
             return True
+        self.stop_writer()
         r = self._exec_func(self._disable_control)
         if r is True:
             self._control = False
@@ -56,7 +91,9 @@ class BaseKeyboard(object):
             "Not all arguments are of int type"
         assert all(-1 < v < 256 for v in (r, g, b)), \
             "Not all arguments are in byte range"
-        return self._exec_func(self._set_full_color, r, g, b)
+        if self._writer is not None:
+            return self._post(lambda frame: frame.fill(r, g, b))
+        return self._exec_func(self._commit_full_color, (r, g, b))
 
     def set_ind_color(self, keys):
         """Set the color of all LEDs on the keyboard individually"""
@@ -66,7 +103,211 @@ class BaseKeyboard(object):
         assert all(isinstance(key, str) for key in keys.keys()), \
             "keys dict does not contain only str keys"
         assert self._control is True, "Control is not enabled"
-        return self._exec_func(self._set_ind_color, keys)
+        if self._writer is not None:
+            return self._post(keys=keys)
+        return self._exec_func(self._commit_ind_color, keys)
+
+    def set_frame(self, frame):
+        """
+        Set the color of all LEDs on the keyboard from a KeyFrame
+
+        The keys in a KeyFrame are valid by construction, so they are
+        not validated individually. Only the keys that change color are
+        passed on to the back-end.
+        """
+        assert isinstance(frame, KeyFrame), "param frame is not a KeyFrame"
+        assert self._control is True, "Control is not enabled"
+        if self._writer is not None:
+            return self._post(lambda copy: copy.copy_from(frame))
+        return self._exec_func(self._commit_frame, frame)
+
+    def start_writer(self):
+        """Switch to asynchronous submission through a writer Thread"""
+        with self._mailbox:
+            if self._writer is not None:
+                return
+            self._generation += 1
+            self._writer = Thread(target=self._write_loop, name="KeyboardWriter",
+                                  args=(self._generation,))
+            self._writer.daemon = True
+            self._writer.start()
+
+    def stop_writer(self):
+        """Send the pending update and return to blocking submission"""
+        with self._mailbox:
+            writer, self._writer = self._writer, None
+            self._generation += 1
+            self._mailbox.notify_all()
+        if writer is not None:
+            writer.join()
+
+    def flush(self):
+        """Block until the writer has sent all posted updates"""
+        with self._mailbox:
+            while self._writer is not None and (self._writing or self._has_mail()):
+                self._mailbox.wait()
+
+    def _has_mail(self):
+        return self._mail_frame is not None or len(self._mail_keys) != 0
+
+    def _post(self, fill=None, keys=None):
+        """
+        Merge an update into the mailbox of the writer
+
+        :param fill: Function that sets the colors of all keys of the
+            KeyFrame passed to it, replacing any pending update
+        :param keys: Dictionary of colors of individual keys to update
+        """
+        with self._mailbox:
+            if fill is not None:
+                if self._mail_frame is None:
+                    self._mail_frame = self._frames.acquire()
+                fill(self._mail_frame)
+                self._mail_keys.clear()
+            elif self._mail_frame is not None:
+                for key, color in keys.items():
+                    if key in INDICES:
+                        self._mail_frame[key] = color
+            else:
+                self._mail_keys.update(keys)
+            self._mailbox.notify_all()
+        return True
+
+    def _write_loop(self, generation):
+        """
+        Send the contents of the mailbox until the writer is stopped
+
+        :param generation: Generation of the writer running this loop,
+            which exits once the generation has changed
+        """
+        while True:
+            with self._mailbox:
+                self._writing = False
+                self._mailbox.notify_all()
+                while not self._has_mail() and self._generation == generation:
+                    self._mailbox.wait()
+                if not self._has_mail():
+                    return
+                frame, keys = self._mail_frame, self._mail_keys
+                self._mail_frame, self._mail_keys = None, dict()
+                self._writing = True
+            try:
+                if frame is not None:
+                    r = self._exec_func(self._commit_frame, frame)
+                else:
+                    r = self._exec_func(self._commit_ind_color, keys)
+                if r is False:
+                    logging.warning("Keyboard writer: back-end call failed")
+            except Exception as e:
+                logging.error("Keyboard writer: {}".format(e))
+            finally:
+                self._frames.release(frame)
+
+    def _commit_full_color(self, color):
+        """Set the color of all keys unless they already have it"""
+        committed = self._committed
+        if self._known == _ALL_KNOWN and committed.uniform() == color:
+            self._suppressed += len(KEYS)
+            return True
+        r = self._set_full_color(*color)
+        if r is False:
+            self._known[:] = _NONE_KNOWN
+        else:
+            committed.fill(*color)
+            self._known[:] = _ALL_KNOWN
+        self._sent += len(KEYS)
+        return r
+
+    def _commit_ind_color(self, keys):
+        """Set the color of the keys that do not already have it"""
+        buf, known = self._committed.buffer, self._known
+        changed = dict()
+        for key, color in keys.items():
+            i = INDICES.get(key)
+            if i is None or not known[i] or tuple(buf[3 * i:3 * i + 3]) != color:
+                changed[key] = color
+        self._suppressed += len(keys) - len(changed)
+        if len(changed) == 0:
+            return True
+        r = self._set_ind_color(changed)
+        for key, color in changed.items():
+            i = INDICES.get(key)
+            if i is None:
+                continue
+            if r is not False:
+                buf[3 * i:3 * i + 3] = bytearray(color)
+            known[i] = r is not False
+        self._sent += len(changed)
+        return r
+
+    def _commit_frame(self, frame):
+        """Set the color of the keys in a KeyFrame that changed"""
+        buf, committed, known = frame.buffer, self._committed.buffer, self._known
+        if known == _ALL_KNOWN and buf == committed:
+            self._suppressed += len(KEYS)
+            return True
+        color = frame.uniform()
+        if color is not None:
+            return self._commit_full_color(color)
+        changed = [i for i in range(len(KEYS)) if not known[i] or
+                   buf[3 * i] != committed[3 * i] or
+                   buf[3 * i + 1] != committed[3 * i + 1] or
+                   buf[3 * i + 2] != committed[3 * i + 2]]
+        r = self._set_frame(frame, changed)
+        for i in changed:
+            if r is not False:
+                committed[3 * i:3 * i + 3] = buf[3 * i:3 * i + 3]
+            known[i] = r is not False
+        self._suppressed += len(KEYS) - len(changed)
+        self._sent += len(changed)
+        return r
+
+    def current_frame(self):
+        """
+        Return the last committed color of every key
+
+        :return: dict {keyname: (r, g, b)} of all keys with a known color
+        """
+        with self._lock:
+            return {key: color for i, (key, color) in
+                    enumerate(self._committed.items()) if self._known[i]}
+
+    def invalidate_frame(self):
+        """Forget the colors of all keys so that they are all sent again"""
+        with self._lock:
+            self._known[:] = _NONE_KNOWN
+
+    def _request_invalidate(self):
+        """
+        Forget the colors of all keys, safe to call from any thread
+
+        For back-ends that learn about failures outside of a call, such
+        as in a callback of the library. If a call is in progress, the
+        colors are forgotten when it returns, as its commit of the
+        cache would otherwise overwrite the invalidation.
+        """
+        self._invalidate = True
+        if self._lock.acquire(False):
+            try:
+                self._apply_invalidate()
+            finally:
+                self._lock.release()
+
+    def _apply_invalidate(self):
+        """Forget the colors of all keys if requested, with the lock held"""
+        if self._invalidate:
+            self._invalidate = False
+            self._known[:] = _NONE_KNOWN
+
+    @property
+    def keys_sent(self):
+        """Amount of key colors passed on to the back-end"""
+        return self._sent
+
+    @property
+    def keys_suppressed(self):
+        """Amount of key colors not passed on as they did not change"""
+        return self._suppressed
 
     def get_device_available(self, *args):
         """Return whether a supported device is available"""
@@ -94,10 +335,11 @@ class BaseKeyboard(object):
 
     def _exec_func(self, func, *args):
         """Execute a function with the library in a thread-safe manner"""
-        self._lock.acquire()
-        r = func(*args)
-        self._lock.release()
-        return r
+        with self._lock:
+            self._apply_invalidate()
+            r = func(*args)
+            self._apply_invalidate()
+            return r
 
     """
     Abstract Functions: To be implemented by back-end
@@ -141,6 +383,21 @@ class BaseKeyboard(object):
         """
         raise NotImplementedError()
 
+    def _set_frame(self, frame, indices):
+        """
+        Set the color of a selection of keys from a KeyFrame
+
+        The default implementation passes the keys on to _set_ind_color
+        as a dictionary. Back-ends may override this function to use the
+        buffer of the KeyFrame directly.
+        :param frame: KeyFrame with the colors of all keys
+        :param indices: Indices in KEYS of the keys that changed color
+        :return: bool
+        """
+        buf = frame.buffer
+        return self._set_ind_color(
+            {KEYS[i]: tuple(buf[3 * i:3 * i + 3]) for i in indices})
+
     def _set_full_color(self, r, g, b):
         """
         Set the color of all LEDs available on the keyboard
@@ -166,6 +423,12 @@ class BaseKeyboard(object):
         raise NotImplementedError()
 
     @staticmethod
-    def is_product_supported(product):
-        """Return whether a product is supported by iProduct USB string"""
+    def is_product_supported(product, inventory=None):
+        """
+        Return whether a product is supported by iProduct USB string
+
+        :param inventory: utilities.Inventory snapshot of the USB
+            devices to use for any further checks instead of scanning
+            the bus again. Back-ends take a snapshot if it is None.
+        """
         raise NotImplementedError()
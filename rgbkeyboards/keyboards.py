@@ -4,11 +4,15 @@ License: GNU GPLv3
 Copyright (c) 2017-2018 RedFantom
 """
 # Standard Library
+import importlib
+import logging
 from platform import architecture
 import sys
+from timeit import default_timer
 # Project Modules
+from rgbkeyboards import registry
 from rgbkeyboards.utilities import \
-    WINDOWS, LINUX, get_dll_path, get_device_list
+    WINDOWS, LINUX, Device, Inventory, get_dll_path
 
 
 PATHS = {
@@ -21,7 +25,7 @@ PATHS = {
             "x86": "MasterKeys.dll",
             "x64": "MasterKeys64.dll"
         },
-        "Logitech, Inc": {
+        "Logitech, Inc.": {
             "x86": "Logitech.dll",
             "x64": "Logitech64.dll",
         }
@@ -46,6 +50,70 @@ BACKENDS = {
 
 VENDORS = list(BACKENDS[WINDOWS].keys())
 
+# Third-party back-ends register in this entry point group as
+# "Manufacturer String = package.module:Keyboard"
+ENTRY_POINT_GROUP = "rgbkeyboards.backends"
+
+_backends = dict()  # Back-end name: Keyboard class
+_entry_points_loaded = set()  # Platforms entry points were added for
+IMPORT_TIMES = dict()  # Back-end name: seconds taken to import
+
+
+def load_backend(name):
+    """
+    Return the Keyboard class of a back-end, importing it only once
+
+    :param name: Module name of the back-end, which should provide a
+        Keyboard class, or "module:attribute" for another attribute
+    :raises RuntimeError: If the back-end could not be imported
+    """
+    if name in _backends:
+        return _backends[name]
+    module, _, attribute = name.partition(":")
+    start = default_timer()
+    try:
+        backend = getattr(importlib.import_module(module), attribute or "Keyboard")
+    except (ImportError, AttributeError) as e:
+        raise RuntimeError("Failed to load back-end {}: {}".format(name, e))
+    IMPORT_TIMES[name] = default_timer() - start
+    logging.debug("Loaded back-end {} in {:.1f} ms".format(
+        name, IMPORT_TIMES[name] * 1000))
+    _backends[name] = backend
+    return backend
+
+
+def _iter_entry_points():
+    """Return the entry points in the back-end group as (name, value)"""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        try:
+            import pkg_resources
+        except ImportError:
+            return []
+        return [(ep.name, "{}:{}".format(ep.module_name, ".".join(ep.attrs)))
+                for ep in pkg_resources.iter_entry_points(ENTRY_POINT_GROUP)]
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        eps = eps.select(group=ENTRY_POINT_GROUP)
+    else:  # Python < 3.10
+        eps = eps.get(ENTRY_POINT_GROUP, [])
+    return [(ep.name, ep.value) for ep in eps]
+
+
+def add_entry_points(platform):
+    """
+    Add the back-ends registered as entry points to BACKENDS
+
+    Built-in back-ends take precedence over back-ends registered for
+    the same manufacturer. The entry points are only read once.
+    """
+    if platform in _entry_points_loaded:
+        return
+    _entry_points_loaded.add(platform)
+    for vendor, value in _iter_entry_points():
+        BACKENDS.setdefault(platform, dict()).setdefault(vendor, value)
+
 
 class Keyboards(object):
     """
@@ -62,6 +130,7 @@ class Keyboards(object):
         self.paths = PATHS
         if paths is not None:
             self.paths.update(paths)
+        add_entry_points(self.platform)
 
     @property
     def platform(self):
@@ -73,29 +142,49 @@ class Keyboards(object):
         raise RuntimeError(
             "Unsupported platform detected: {}".format(sys.platform))
 
-    def detect_devices(self):
-        """Detect devices using either the Windows or Linux backend"""
-        devices = get_device_list(VENDORS)
-        for device in devices.copy():
+    def detect_devices(self, inventory=None):
+        """
+        Detect devices using either the Windows or Linux backend
+
+        :param inventory: Inventory of the USB devices to detect the
+            supported devices in, a new snapshot is taken if not given.
+            The back-ends check support against the same snapshot.
+
+        The vendor of a device is determined by its vendor id if it is
+        in the registry, and devices of which the model is in the
+        registry are supported without further checks. Only for other
+        devices the back-end checks support by product string.
+        """
+        if inventory is None:
+            inventory = Inventory.snapshot()
+        devices = list()
+        for usb_device in inventory:
+            vendor = registry.vendor_name(usb_device.vendor_id) or usb_device.vendor
+            if vendor not in BACKENDS[self.platform]:
+                continue
+            device = Device(vendor, usb_device.product)
+            if device in devices:
+                continue
             backend = self.get_backend(device)
             if backend is None:
-                devices.remove(device)
                 continue
-            _, product = device
-            if not backend.is_product_supported(product):
-                devices.remove(device)
+            model = registry.lookup(usb_device.vendor_id, usb_device.product_id)
+            if model is None and not \
+                    backend.is_product_supported(device.product, inventory):
+                continue
+            devices.append(device)
         return devices
 
     def get_backend(self, device):
         """Return the proper backend Keyboard class for a given device"""
         if device.vendor not in BACKENDS[self.platform]:
             return None
-        module = BACKENDS[self.platform][device.vendor]
-        try:
-            exec("from {} import Keyboard".format(module))
-        except ImportError as e:
-            raise RuntimeError("Failed to load back-end {}".format(module))
-        return locals()["Keyboard"]
+        return load_backend(BACKENDS[self.platform][device.vendor])
+
+    @staticmethod
+    def import_times():
+        """Return a dictionary {back-end: seconds} of import durations"""
+        return dict(IMPORT_TIMES)
 
     @property
     def keyboard(self):
@@ -106,6 +195,28 @@ class Keyboards(object):
         device = devices[0]
         return self.init_keyboard(device)
 
+    def keyboards(self, inventory=None):
+        """
+        Return a Keyboard instance for every back-end with a device
+
+        Each back-end controls the first supported device it finds, so
+        multiple devices of the same back-end cannot be controlled
+        separately. At most one instance per back-end is returned, for
+        the first device detected of that back-end.
+        :param inventory: Inventory to detect the devices in, see
+            detect_devices
+        :return: list of Keyboard instances, in order of detection.
+            Combine them with a KeyboardGroup to control them at once.
+        """
+        keyboards, backends = list(), list()
+        for device in self.detect_devices(inventory):
+            backend = self.get_backend(device)
+            if backend in backends:
+                continue
+            backends.append(backend)
+            keyboards.append(self.init_backend(backend, device))
+        return keyboards
+
     def init_keyboard(self, device):
         """Initialize a given keyboard device"""
         Keyboard = self.get_backend(device)
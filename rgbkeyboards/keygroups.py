@@ -3,8 +3,6 @@ Author: RedFantom
 License: GNU GPLv3
 Copyright (c) 2017-2018 RedFantom
 """
-from pynput.keyboard import Key, KeyCode
-
 alphanumeric = [
     '`', '1', '2', '3', '4', '5', '6', '7', '8', '9', '0', '-', '=',
     'tab', 'q', 'w', 'e', 'r', 't', 'y', 'u', 'i', 'o', 'p', '[', ']', '\\',
@@ -14,7 +12,7 @@ alphanumeric = [
 functionkeys = ["F{}".format(i) for i in range(1, 13)]
 modifiers = [
     'capslock', 'enter', 'shift_l', 'shift_r', 'ctrl_l', 'win_l',
-    'alt_l', 'alt_r', 'win_l', 'app', 'ctrl_r']
+    'alt_l', 'alt_r', 'win_r', 'app', 'ctrl_r']
 numpad = [
     'numlock', '(/)', '(*)', '(-)', '(7)', '(8)', '(9)', '(4)',
     '(5)', '(6)', '(+)', '(1)', '(2)', '(3)', '(enter)', '(0)',
@@ -26,47 +24,114 @@ controls = [
     'delete', 'end', 'pagedown', 'P1', 'P2', 'P3', 'P4'
 ]
 
-pynput_rgb_keys = {
-    Key.shift: "shift_l",
-    Key.shift_l: "shift_l",
-    Key.shift_r: "shift_r",
-    Key.alt: "alt_l",
-    Key.alt_gr: "alt_r",
-    Key.alt_r: "alt_r",
-    Key.alt_l: "alt_l",
-    Key.backspace: "backspace",
-    Key.pause: "pause",
-    Key.esc: "esc",
-    Key.print_screen: "printscreen",
-    Key.scroll_lock: "scrollock",
-    Key.up: "up",
-    Key.down: "down",
-    Key.left: "left",
-    Key.right: "right",
-    Key.insert: "insert",
-    Key.home: "home",
-    Key.page_up: "pageup",
-    Key.delete: "delete",
-    Key.end: "end",
-    Key.page_down: "pagedown",
-    Key.enter: "enter",
-    Key.f1: "F1",
-    Key.f2: "F2",
-    Key.f3: "F3",
-    Key.f4: "F4",
-    Key.f5: "F5",
-    Key.f6: "F6",
-    Key.f7: "F7",
-    Key.f8: "F8",
-    Key.f9: "F9",
-    Key.f10: "F10",
-    Key.f11: "F11",
-    Key.f12: "F12",
-}
-
 all = alphanumeric + functionkeys + modifiers + numpad + controls
 
-pynput_rgb_keys.update({KeyCode(char=item): item for item in alphanumeric})
+# Registry of stable integer key ids: the index of every key in all
+# without duplicates. Back-ends translate these ids with flat tables.
+key_names = list()
+key_ids = dict()
+for _name in all:
+    if _name not in key_ids:
+        key_ids[_name] = len(key_names)
+        key_names.append(_name)
+
+
+def key_id(name):
+    """Return the integer id of a key by its name"""
+    return key_ids[name]
+
+
+def translate(table, colors):
+    """
+    Translate the keys of a dictionary through a key id table
+
+    :param table: Table as returned by build_table
+    :param colors: Dictionary {keyname: value}
+    :return: list of (table value, value) pairs. Keys that are not in
+        the registry or that have no value in the table are skipped.
+    """
+    pairs = list()
+    for name, value in colors.items():
+        i = key_ids.get(name)
+        if i is not None and table[i] is not None:
+            pairs.append((table[i], value))
+    return pairs
+
+
+def build_table(mapping, default=None):
+    """
+    Build a flat translation table indexed by key id
+
+    :param mapping: Dictionary {keyname: value}, for example of LED ids
+        or (row, column) coordinates of a back-end
+    :param default: Value for keys that are not in mapping
+    :return: list with the value of every key at the index of its id
+    """
+    return [mapping.get(name, default) for name in key_names]
+
+
+_pynput_rgb_keys = None
+
+
+def get_pynput_rgb_keys():
+    """
+    Return the dictionary {pynput key: keyname}
+
+    pynput is only imported on the first call, so that importing this
+    module does not require a display or input device and is fast.
+    """
+    global _pynput_rgb_keys
+    if _pynput_rgb_keys is not None:
+        return _pynput_rgb_keys
+    from pynput.keyboard import Key, KeyCode
+    keys = {
+        Key.shift: "shift_l",
+        Key.shift_l: "shift_l",
+        Key.shift_r: "shift_r",
+        Key.alt: "alt_l",
+        Key.alt_gr: "alt_r",
+        Key.alt_r: "alt_r",
+        Key.alt_l: "alt_l",
+        Key.backspace: "backspace",
+        Key.pause: "pause",
+        Key.esc: "esc",
+        Key.print_screen: "printscreen",
+        Key.scroll_lock: "scrollock",
+        Key.up: "up",
+        Key.down: "down",
+        Key.left: "left",
+        Key.right: "right",
+        Key.insert: "insert",
+        Key.home: "home",
+        Key.page_up: "pageup",
+        Key.delete: "delete",
+        Key.end: "end",
+        Key.page_down: "pagedown",
+        Key.enter: "enter",
+        Key.f1: "F1",
+        Key.f2: "F2",
+        Key.f3: "F3",
+        Key.f4: "F4",
+        Key.f5: "F5",
+        Key.f6: "F6",
+        Key.f7: "F7",
+        Key.f8: "F8",
+        Key.f9: "F9",
+        Key.f10: "F10",
+        Key.f11: "F11",
+        Key.f12: "F12",
+    }
+    keys.update({KeyCode(char=item): item for item in alphanumeric})
+    _pynput_rgb_keys = keys
+    return keys
+
+
+def __getattr__(name):
+    """Load pynput_rgb_keys on first access (Python 3.7+)"""
+    if name == "pynput_rgb_keys":
+        return get_pynput_rgb_keys()
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
+
 
 if __name__ == '__main__':
     print(len(alphanumeric) + len(functionkeys) + len(modifiers) + len(numpad) + len(controls))
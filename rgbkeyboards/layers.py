@@ -0,0 +1,186 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+from collections import OrderedDict
+# Project Modules
+from rgbkeyboards.frame import KeyFrame, KEYS, INDICES
+
+# Blend modes
+REPLACE = "replace"  # Source overwrites destination, opacity is ignored
+ADD = "add"  # Channels are added and clipped
+MULTIPLY = "multiply"  # Channels are multiplied, so white is transparent
+MAX = "max"  # Brightest channel value wins
+ALPHA = "alpha"  # Source is mixed with destination by opacity
+
+BLEND_MODES = (REPLACE, ADD, MULTIPLY, MAX, ALPHA)
+
+
+# Functions to blend a single channel value of the source onto the
+# destination with, by blend mode. REPLACE and ALPHA use the source.
+_BLEND_FUNCTIONS = {
+    ADD: lambda dst, src: min(dst + src, 255),
+    MULTIPLY: lambda dst, src: dst * src // 255,
+    MAX: max,
+    ALPHA: lambda dst, src: src,
+}
+
+
+class Layer(object):
+    """
+    Sparse set of key colors blended onto the layers below it
+
+    A Layer offers the same set_full_color and set_ind_color functions
+    as a keyboard. Keys that were never set are transparent. A full
+    color covers all keys and discards the individually set keys.
+
+    :param name: Name of the layer for debugging
+    :param blend: Blend mode, one of BLEND_MODES
+    :param opacity: Float in [0, 1] the blended result is mixed with
+        the layers below it by. Ignored for REPLACE.
+    """
+
+    def __init__(self, name, blend=REPLACE, opacity=1.0):
+        assert blend in BLEND_MODES, "Invalid blend mode: {}".format(blend)
+        assert 0.0 <= opacity <= 1.0, "Opacity must be in range [0, 1]"
+        self.name = name
+        self.blend = blend
+        self.opacity = opacity
+        self.fill = None
+        self.keys = dict()
+        self.dirty = False
+
+    def set_full_color(self, r, g, b):
+        """Cover all keys with a single color"""
+        self.fill = (r, g, b)
+        self.keys.clear()
+        self.dirty = True
+
+    def set_ind_color(self, keys):
+        """Set the color of individual keys"""
+        self.keys.update(keys)
+        self.dirty = True
+
+    def clear(self):
+        """Make all keys of the layer transparent"""
+        self.fill = None
+        self.keys.clear()
+        self.dirty = True
+
+    @property
+    def is_empty(self):
+        return self.fill is None and len(self.keys) == 0
+
+    def apply(self, buf):
+        """
+        Blend this layer onto a frame buffer in place
+
+        The buffer is a bytearray of three bytes per key, ordered as in
+        KEYS. Only the keys covered by the layer are touched, so the
+        cost is linear in the amount of keys.
+        """
+        if self.is_empty:
+            return
+        mode = self.blend
+        if mode == REPLACE and len(self.keys) == 0:
+            buf[:] = bytearray(self.fill) * len(KEYS)
+            return
+        if self.fill is not None:
+            cover = [self.fill] * len(KEYS)
+            for key, color in self.keys.items():
+                if key in INDICES:
+                    cover[INDICES[key]] = color
+            items = enumerate(cover)
+        else:
+            items = ((INDICES[key], color) for key, color in self.keys.items()
+                     if key in INDICES)
+        if mode == REPLACE:
+            for i, color in items:
+                buf[3 * i:3 * i + 3] = bytearray(color)
+            return
+        blend, opacity = _BLEND_FUNCTIONS[mode], self.opacity
+        for i, color in items:
+            i *= 3
+            for c in range(3):
+                dst = buf[i + c]
+                src = blend(dst, color[c])
+                if opacity != 1.0:
+                    src = int(round(dst + (src - dst) * opacity))
+                buf[i + c] = src
+
+    def merge(self, layer):
+        """
+        Copy the colors of a REPLACE Layer onto this layer
+
+        Keys covered by the other layer take its colors, the other keys
+        are left as they are.
+        """
+        assert layer.blend == REPLACE, "Only REPLACE layers can be merged"
+        if layer.fill is not None:
+            self.set_full_color(*layer.fill)
+        if len(layer.keys) != 0:
+            self.set_ind_color(layer.keys)
+
+
+class LayerStack(object):
+    """
+    Ordered set of Layers composited into a single frame
+
+    From bottom to top, the stack consists of the base layer, the
+    effect layers in the order they were added and the overlay layers.
+    The overlay group starts with a single overlay layer that reactive
+    or notification input can be written to directly.
+    """
+
+    def __init__(self):
+        self.base = Layer("base")
+        self.overlay = Layer("overlay")
+        self._effects = OrderedDict()
+        self._overlays = OrderedDict()
+        self._changed = True
+
+    def add(self, id, layer, overlay=False):
+        """Add a Layer for an effect identified by id"""
+        (self._overlays if overlay else self._effects)[id] = layer
+        self._changed = True
+
+    def remove(self, id):
+        """Remove the Layer of an effect identified by id"""
+        for layers in (self._effects, self._overlays):
+            if id in layers:
+                del layers[id]
+                self._changed = True
+
+    def get(self, id):
+        """Return the Layer of an effect identified by id or None"""
+        return self._effects.get(id, self._overlays.get(id))
+
+    @property
+    def layers(self):
+        """List of all Layers from bottom to top"""
+        return [self.base] + list(self._effects.values()) + \
+            [self.overlay] + list(self._overlays.values())
+
+    @property
+    def dirty(self):
+        """Whether the composited frame may have changed"""
+        return self._changed or any(layer.dirty for layer in self.layers)
+
+    def composite(self, frame=None):
+        """
+        Composite all Layers into a KeyFrame
+
+        :param frame: KeyFrame to composite into, for example from a
+            FramePool. A new KeyFrame is created if not given.
+        :return: KeyFrame, keys not covered by any Layer are off
+        """
+        if frame is None:
+            frame = KeyFrame()
+        frame.clear()
+        for layer in self.layers:
+            layer.apply(frame.buffer)
+            layer.dirty = False
+        self._changed = False
+        return frame
@@ -5,18 +5,13 @@ Copyright (c) 2017-2018 RedFantom
 """
 # Standard Library
 import logging
-# Backend Modules
-from rgbkeyboards.windows.masterkeys.keys import \
-    LAYOUTS, L, M, S, US, EU
 # Project Modules
+from rgbkeyboards import registry
+from rgbkeyboards.clock import MonotonicClock
 from rgbkeyboards.keyboard import BaseKeyboard
-
-
-DEVICE_LAYOUTS = {
-    # TODO: Complete this list with more data
-    0x003b: (L, US),
-    0x0047: (L, EU),
-}
+from rgbkeyboards.keygroups import build_table, translate
+from rgbkeyboards.layouts import LAYOUTS
+from rgbkeyboards.utilities import Inventory
 
 
 SUCCESS = 0
@@ -30,17 +25,32 @@ class Keyboard(BaseKeyboard):
     key coordinates. On Linux, it is difficult to determine the layout
     of a keyboard, especially as the MasterKeys devices do not identify
     even whether they support lighting effects using USB descriptors.
+
+    The cells of the lighting matrix that have not been sent to the
+    keyboard yet are tracked. If fewer cells are dirty than the
+    crossover, they are sent with a call per LED, else the whole matrix
+    is sent with a single call. The crossover is the amount of per-LED
+    calls that take as long as a full-matrix call. It is measured the
+    first time control is enabled on a device, which sends the whole
+    lighting matrix CROSSOVER_SAMPLES times, and reused afterwards.
     """
 
     VENDOR = "Cooler Master Technology Inc."
 
+    DEFAULT_CROSSOVER = 8
+    CROSSOVER_SAMPLES = 3
+
     def _setup_lib(self):
         """Load masterkeys module and initialize required attributes"""
         import masterkeys as mk
         self._library = mk
         self._layout = None
         self._size = None
+        self._coords = None  # (row, column) of every key id
         self._lighting = mk.build_layout_list()
+        self._dirty = set()  # (row, column) of cells not sent yet
+        self._crossover = Keyboard.DEFAULT_CROSSOVER
+        self._crossovers = dict()  # Measured crossover by device ident
         global SUCCESS
         SUCCESS = mk.SUCCESS
 
@@ -60,46 +70,115 @@ class Keyboard(BaseKeyboard):
             return False
         self._control = True
         self._size, self._layout = self._get_layout()
+        if self._size is not None and self._layout is not None:
+            self._coords = build_table(LAYOUTS[self._size][self._layout])
+        device = self._library.get_device_ident()
+        if device not in self._crossovers:
+            crossover = self._measure_crossover()
+            if crossover is None:
+                self._crossover = Keyboard.DEFAULT_CROSSOVER
+                return True
+            self._crossovers[device] = crossover
+        self._crossover = self._crossovers[device]
         return True
 
+    def _measure_crossover(self):
+        """
+        Return the amount of per-LED calls as slow as a full-matrix call
+
+        Both calls are timed a few times, sending the current lighting
+        matrix, and the fastest of each are compared.
+        :return: int, or None if any of the calls failed
+        """
+        clock, lib, lighting = MonotonicClock(), self._library, self._lighting
+        r, g, b = lighting[0][0]
+        full, single = list(), list()
+        for _ in range(Keyboard.CROSSOVER_SAMPLES):
+            start = clock.now()
+            if lib.set_all_led_color(lighting) != SUCCESS:
+                return None
+            middle = clock.now()
+            if lib.set_ind_led_color(0, 0, r, g, b) != SUCCESS:
+                return None
+            full.append(middle - start)
+            single.append(clock.now() - middle)
+        self._dirty.clear()
+        return max(1, min(full) // max(min(single), 1))
+
     def _disable_control(self):
         """Disable control on the controlled keyboard"""
         r = self._library.disable_control()
         if r != SUCCESS:
             return False
-        self._size, self._layout = None, None
+        self._size, self._layout, self._coords = None, None, None
         return True
 
     def _get_layout(self):
         """Return the layout and size for the controlled device"""
-        device = self._library.get_device_ident()
-        if device not in DEVICE_LAYOUTS:
+        model = registry.lookup(
+            registry.COOLER_MASTER, self._library.get_device_ident())
+        if model is None or model.layout is None:
             return None, None
-        return DEVICE_LAYOUTS[device]
+        return model.size, model.layout
 
     def _set_full_color(self, r, g, b):
         """Set the color of LEDs on the keyboard"""
-        return self._library.set_full_led_color(r, g, b)
+        if self._library.set_full_led_color(r, g, b) != SUCCESS:
+            return False
+        for row in self._lighting:
+            row[:] = [(r, g, b)] * len(row)
+        self._dirty.clear()
+        return True
 
     def _set_ind_color(self, leds):
         """Set the color of individual LEDs"""
-        if self._size is None or self._layout is None:
-            device = self._library.get_device_ident()
-            logging.info("[MasterKeys RGB Keyboard Backend] "
-                         "Unknown layout for device {}. Please report "
-                         "this in the GitHub repository.".format(device))
-            return False
-        layout = LAYOUTS[self._size][self._layout]
-        for name, (r, g, b) in leds.items():
-            coords = layout[name]
-            if coords is None:
-                continue
-            r, c = coords
-            self._lighting[r][c] = (r, g, b)
-        return self._library.set_all_led_color(self._lighting) == SUCCESS
+        if self._coords is None:
+            return self._unknown_layout()
+        return self._set_cells(translate(self._coords, leds))
+
+    def _set_frame(self, frame, indices):
+        """Set the colors of the changed keys of a KeyFrame"""
+        if self._coords is None:
+            return self._unknown_layout()
+        buf, table = frame.buffer, self._coords
+        return self._set_cells(
+            (table[i], (buf[3 * i], buf[3 * i + 1], buf[3 * i + 2]))
+            for i in indices if table[i] is not None)
+
+    def _set_cells(self, cells):
+        """
+        Update the lighting matrix and send the dirty cells
+
+        :param cells: Iterable of ((row, column), (r, g, b)) pairs
+        """
+        lighting, dirty = self._lighting, self._dirty
+        for (row, column), color in cells:
+            lighting[row][column] = color
+            dirty.add((row, column))
+        if len(dirty) == 0:
+            return True
+        if len(dirty) >= self._crossover:
+            if self._library.set_all_led_color(lighting) != SUCCESS:
+                return False
+            dirty.clear()
+            return True
+        for row, column in list(dirty):
+            r, g, b = lighting[row][column]
+            if self._library.set_ind_led_color(row, column, r, g, b) != SUCCESS:
+                return False
+            dirty.discard((row, column))
+        return True
+
+    def _unknown_layout(self):
+        """Report that the layout of the controlled device is unknown"""
+        device = self._library.get_device_ident()
+        logging.info("[MasterKeys RGB Keyboard Backend] "
+                     "Unknown layout for device {}. Please report "
+                     "this in the GitHub repository.".format(device))
+        return False
 
     @staticmethod
-    def is_product_supported(product):
+    def is_product_supported(product, inventory=None):
         """
         Determine whether a product is supported with USB iProduct
 
@@ -107,16 +186,9 @@ class Keyboard(BaseKeyboard):
         function only checks whether the keyboard is a MasterKeys
         device with three HID Interfaces.
         """
-        import usb.core
-        devices = usb.core.find(find_all=True)
-        for device in devices:
-            try:
-                is_vendor = device.manufacturer == Keyboard.VENDOR
-                is_product = device.product == product
-            except ValueError:
-                continue
-            if not is_vendor or not is_product:
-                continue
-            config = device.get_active_configuration()
-            return config.bNumInterfaces == 3
+        if inventory is None:
+            inventory = Inventory.snapshot()
+        for device in inventory.with_product(product):
+            if device.vendor == Keyboard.VENDOR:
+                return device.interfaces == 3
         return False
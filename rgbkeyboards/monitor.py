@@ -0,0 +1,208 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+import logging
+import os
+import select
+import socket
+from threading import Event, Lock, Thread
+# Project Modules
+from rgbkeyboards.keyboards import Keyboards
+from rgbkeyboards.utilities import \
+    SYSFS_USB_DEVICES, Inventory, read_sysfs_device
+
+NETLINK_KOBJECT_UEVENT = 15
+KERNEL_GROUP = 1  # Multicast group of the uevents sent by the kernel
+UEVENT_BUFFER_SIZE = 64 * 1024
+
+
+def parse_uevent(data):
+    """
+    Parse a kernel uevent message into a dictionary
+
+    A message consists of a header "action@devpath" and KEY=VALUE
+    properties, all terminated by null bytes. Messages that do not
+    follow this format, such as those rebroadcast by udev, give None.
+    """
+    parts = data.split(b"\x00")
+    if b"@" not in parts[0]:
+        return None
+    event = dict()
+    for part in parts[1:]:
+        key, sep, value = part.partition(b"=")
+        if sep:
+            event[key.decode()] = value.decode("utf-8", "replace")
+    if "ACTION" not in event or "DEVPATH" not in event:
+        return None
+    return event
+
+
+class DeviceMonitor(Thread):
+    """
+    Keeps the list of supported devices up to date on hotplug events
+
+    Listens to the uevents the kernel sends over a netlink socket when
+    USB devices are added or removed. If the socket cannot be opened,
+    for example on platforms other than Linux or when netlink is not
+    permitted, the sysfs USB devices directory is polled instead. Only
+    the device that changed is examined, the bus is not scanned again.
+
+    The callbacks are called from the monitor Thread with the Device
+    that was attached or detached.
+
+    :param on_attach: Callable called with a supported Device attached
+    :param on_detach: Callable called with a supported Device detached
+    :param keyboards: Keyboards instance to check support with
+    :param root: sysfs directory of the USB devices
+    :param interval: Period in seconds to poll sysfs with if netlink is
+        not available, and the timeout of the wait for uevents
+    """
+
+    def __init__(self, on_attach=None, on_detach=None, keyboards=None,
+                 root=SYSFS_USB_DEVICES, interval=1.0):
+        """Initialize attributes and Thread"""
+        Thread.__init__(self)
+        self.daemon = True
+        self._on_attach = on_attach
+        self._on_detach = on_detach
+        self._keyboards = keyboards if keyboards is not None else Keyboards()
+        self._root = root
+        self._interval = interval
+        self._lock = Lock()
+        self._exit = Event()
+        self._names = set()  # sysfs names of all USB devices
+        self._supported = dict()  # sysfs name: supported Device
+        self._socket = None
+        self._logger = logging.getLogger("DeviceMonitor")
+
+    @property
+    def devices(self):
+        """List of the supported Devices currently attached"""
+        with self._lock:
+            return list(self._supported.values())
+
+    def scan(self):
+        """Build the list of devices from sysfs without callbacks"""
+        names = set(self._list_names())
+        supported = dict()
+        for name in names:
+            device = self._check(name)
+            if device is not None:
+                supported[name] = device
+        with self._lock:
+            self._names, self._supported = names, supported
+
+    def start(self):
+        """Scan the devices once and start monitoring in the Thread"""
+        self.scan()
+        try:
+            sock = socket.socket(
+                socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, KERNEL_GROUP))
+            self._socket = sock
+        except (AttributeError, OSError, socket.error) as e:
+            self._logger.info("Netlink not available, polling sysfs: {}".format(e))
+            self._socket = None
+        Thread.start(self)
+
+    def stop(self):
+        """Stop monitoring and wait for the Thread to exit"""
+        self._exit.set()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        """
+        Process uevents or poll sysfs until stop is called
+
+        An error while processing a single event, for example raised by
+        a callback, is logged and does not stop the monitor.
+        """
+        try:
+            while not self._exit.is_set():
+                if self._socket is None:
+                    self._safe_call(self.poll)
+                    self._exit.wait(self._interval)
+                    continue
+                readable, _, _ = select.select([self._socket], [], [], self._interval)
+                if len(readable) != 0:
+                    self._safe_call(self.handle_uevent, self._socket.recv(UEVENT_BUFFER_SIZE))
+        finally:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+    def _safe_call(self, func, *args):
+        """Call func(*args) and log any exception it raises"""
+        try:
+            func(*args)
+        except Exception:
+            self._logger.exception("Error while processing device changes")
+
+    def handle_uevent(self, data):
+        """
+        Update the devices for a single uevent message
+
+        Only the add and remove events of whole USB devices are of
+        interest, the events of their interfaces are ignored.
+        """
+        event = parse_uevent(data)
+        if event is None or event.get("SUBSYSTEM") != "usb" or \
+                event.get("DEVTYPE") != "usb_device":
+            return
+        name = os.path.basename(event["DEVPATH"])
+        if event["ACTION"] == "add":
+            self._attach(name)
+        elif event["ACTION"] == "remove":
+            self._detach(name)
+
+    def poll(self):
+        """Update the devices for the differences in the sysfs directory"""
+        names = set(self._list_names())
+        with self._lock:
+            added, removed = names - self._names, self._names - names
+        for name in sorted(removed):
+            self._detach(name)
+        for name in sorted(added):
+            self._attach(name)
+
+    def _list_names(self):
+        """Return the names of the USB devices in sysfs"""
+        try:
+            return [name for name in os.listdir(self._root) if ":" not in name]
+        except OSError:
+            return []
+
+    def _check(self, name):
+        """Return the Device of a sysfs entry if supported, else None"""
+        usb_device = read_sysfs_device(os.path.join(self._root, name))
+        if usb_device is None:
+            return None
+        devices = self._keyboards.detect_devices(Inventory([usb_device]))
+        return devices[0] if len(devices) != 0 else None
+
+    def _attach(self, name):
+        """Process the addition of the USB device with a sysfs name"""
+        device = self._check(name)
+        with self._lock:
+            self._names.add(name)
+            if device is None or name in self._supported:
+                return
+            self._supported[name] = device
+        self._logger.debug("Attached: {}".format(device))
+        if self._on_attach is not None:
+            self._on_attach(device)
+
+    def _detach(self, name):
+        """Process the removal of the USB device with a sysfs name"""
+        with self._lock:
+            self._names.discard(name)
+            device = self._supported.pop(name, None)
+        if device is None:
+            return
+        self._logger.debug("Detached: {}".format(device))
+        if self._on_detach is not None:
+            self._on_detach(device)
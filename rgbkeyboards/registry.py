@@ -0,0 +1,90 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+from collections import namedtuple
+# Project Modules
+from rgbkeyboards.layouts import LAYOUTS, L, M, US, EU
+
+# USB vendor ids of the supported manufacturers
+COOLER_MASTER = 0x2516
+LOGITECH = 0x046d
+CORSAIR = 0x1b1c
+
+# Manufacturer strings as used for the BACKENDS and PATHS dictionaries
+VENDORS = {
+    COOLER_MASTER: "Cooler Master Technology Inc.",
+    LOGITECH: "Logitech, Inc.",
+    CORSAIR: "Corsair",
+}
+
+# Per-model metadata
+# name: Short model name, as used by the back-ends
+# size: Keyboard size, L (full), M (tenkeyless) or S (compact) as in
+#   layouts
+# layout: Physical layout, US or EU, None if the product id is shared
+#   across layouts
+# leds: Amount of individually controllable LEDs, None if unknown
+# per_key: Whether the model supports per-key lighting
+Model = namedtuple("Model", ["name", "size", "layout", "leds", "per_key"])
+
+
+def _masterkeys(size, layout):
+    """Return the Model of a MasterKeys keyboard from its layout table"""
+    leds = sum(1 for coords in LAYOUTS[size][layout].values() if coords is not None)
+    return Model("MasterKeys", size, layout, leds, True)
+
+
+MODELS = {
+    (COOLER_MASTER, 0x003b): _masterkeys(L, US),
+    (COOLER_MASTER, 0x0047): _masterkeys(L, EU),
+    # Logitech models, not all of them support per-key RGB lighting
+    (LOGITECH, 0xc32b): Model("G910", L, None, None, True),  # Orion Spark
+    (LOGITECH, 0xc335): Model("G910", L, None, None, True),  # Orion Spectrum
+    (LOGITECH, 0xc337): Model("G810", L, None, None, True),
+    (LOGITECH, 0xc333): Model("G610", L, None, None, True),
+    (LOGITECH, 0xc24d): Model("G710+", L, None, None, False),
+    (LOGITECH, 0xc22d): Model("G510", L, None, None, False),
+    (LOGITECH, 0xc22e): Model("G510", L, None, None, False),  # Audio enabled
+    (LOGITECH, 0xc22b): Model("G110", L, None, None, False),
+    (LOGITECH, 0xc248): Model("G105", L, None, None, False),
+    (LOGITECH, 0xc225): Model("G11", L, None, None, False),
+    (LOGITECH, 0xc222): Model("G15", L, None, None, False),
+    (LOGITECH, 0xc227): Model("G15", L, None, None, False),  # Version 2
+    (CORSAIR, 0x1b17): Model("K65 RGB", M, None, None, True),
+    (CORSAIR, 0x1b13): Model("K70 RGB", L, None, None, True),
+    (CORSAIR, 0x1b33): Model("K70 LUX RGB", L, None, None, True),
+    (CORSAIR, 0x1b11): Model("K95 RGB", L, None, None, True),
+    (CORSAIR, 0x1b2d): Model("K95 RGB Platinum", L, None, None, True),
+    (CORSAIR, 0x1b20): Model("Strafe RGB", L, None, None, True),
+}
+
+
+def lookup(vendor_id, product_id):
+    """Return the Model of a device by USB identifiers, or None"""
+    return MODELS.get((vendor_id, product_id))
+
+
+def vendor_name(vendor_id):
+    """Return the manufacturer string of a vendor id, or None"""
+    return VENDORS.get(vendor_id)
+
+
+def find(inventory, vendor_id=None):
+    """
+    Return the known devices in an Inventory
+
+    :param inventory: utilities.Inventory snapshot
+    :param vendor_id: Only return devices of this vendor if given
+    :return: list of (UsbDevice, Model) pairs
+    """
+    found = list()
+    for device in inventory:
+        if vendor_id is not None and device.vendor_id != vendor_id:
+            continue
+        model = MODELS.get((device.vendor_id, device.product_id))
+        if model is not None:
+            found.append((device, model))
+    return found
@@ -12,7 +12,11 @@ import sys
 WINDOWS = "windows"
 LINUX = "linux"
 
+SYSFS_USB_DEVICES = "/sys/bus/usb/devices"
+
 Device = namedtuple("Device", ["vendor", "product"])
+UsbDevice = namedtuple(
+    "UsbDevice", ["vendor", "product", "vendor_id", "product_id", "interfaces"])
 
 
 def get_dll_path(path):
@@ -39,36 +43,153 @@ def get_platform():
     raise RuntimeError("Unsupported platform: {}".format(sys.platform))
 
 
-def get_device_list(vendors):
-    """Return a list of Devices with a specific list of vendors"""
-    device_list = list()
-
-    def process(vendor, product):
-        supported_vendor = vendor in vendors
-        if not supported_vendor or vendor is None:
-            return
-        device = Device(vendor, product)
-        if device in device_list:
-            return
-        device_list.append(device)
-
-    if get_platform() is WINDOWS:
-        from pywinusb import hid
-        devices = hid.HidDeviceFilter().get_devices()
-        for device in devices:
-            if not isinstance(device, hid.HidDevice):
+class Inventory(object):
+    """
+    Snapshot of the USB devices connected to the computer
+
+    The devices are enumerated and their descriptors are read in a
+    single pass, so that device detection and the support checks of
+    the back-ends can share the snapshot instead of each scanning the
+    bus again. Devices are indexed by product string for the checks.
+
+    :param devices: Iterable of UsbDevice
+    """
+
+    def __init__(self, devices):
+        self.devices = tuple(devices)
+        self._products = dict()
+        for device in self.devices:
+            self._products.setdefault(device.product, list()).append(device)
+
+    def __iter__(self):
+        return iter(self.devices)
+
+    def __len__(self):
+        return len(self.devices)
+
+    @classmethod
+    def snapshot(cls):
+        """
+        Return an Inventory of the currently connected devices
+
+        On Linux, the devices are read from sysfs if it is available,
+        which does not require opening the devices.
+        """
+        if get_platform() is WINDOWS:
+            return cls(_enumerate_windows())
+        if os.path.isdir(SYSFS_USB_DEVICES):
+            return cls.from_sysfs()
+        return cls(_enumerate_linux())
+
+    @classmethod
+    def from_sysfs(cls, root=SYSFS_USB_DEVICES):
+        """Return an Inventory of the USB devices listed in sysfs"""
+        return cls(_enumerate_sysfs(root))
+
+    def with_product(self, product):
+        """Return the list of UsbDevices with a product string"""
+        return self._products.get(product, [])
+
+    def device_list(self, vendors):
+        """Return a list of unique Devices with a vendor in vendors"""
+        device_list, seen = list(), set()
+        for device in self.devices:
+            if device.vendor is None or device.vendor not in vendors:
                 continue
-            vendor, product = device.vendor_name, device.product_name
-            process(vendor, product)
-
-    elif get_platform() is LINUX:
-        import usb.core
-        devices = usb.core.find(find_all=True)
-        for device in devices:
-            try:
-                vendor, product = device.manufacturer, device.product
-            except ValueError:
+            key = Device(device.vendor, device.product)
+            if key in seen:
                 continue
-            process(vendor, product)
+            seen.add(key)
+            device_list.append(key)
+        return device_list
+
+
+def _enumerate_windows():
+    """
+    Return a UsbDevice for every HID device on Windows
+
+    Every HID interface is a separate HidDevice, so the interfaces of a
+    device are counted by grouping on the identifiers.
+    """
+    from pywinusb import hid
+    counts, order = dict(), list()
+    for device in hid.HidDeviceFilter().get_devices():
+        if not isinstance(device, hid.HidDevice):
+            continue
+        key = (device.vendor_name, device.product_name,
+               device.vendor_id, device.product_id)
+        if key not in counts:
+            counts[key] = 0
+            order.append(key)
+        counts[key] += 1
+    return [UsbDevice(*key, interfaces=counts[key]) for key in order]
+
+
+def _read_attribute(path, name):
+    """Return the stripped contents of a sysfs attribute or None"""
+    try:
+        with open(os.path.join(path, name)) as fi:
+            return fi.read().strip()
+    except (IOError, OSError):  # Missing or not readable
+        return None
+
+
+def _enumerate_sysfs(root):
+    """
+    Return a UsbDevice for every USB device in a sysfs directory
+
+    The attributes of the devices are read from the files the kernel
+    exposes in sysfs, so no device is opened and no transfers are
+    performed. Entries without idVendor, such as the interfaces of a
+    device, are skipped.
+    """
+    devices = list()
+    for name in sorted(os.listdir(root)):
+        device = read_sysfs_device(os.path.join(root, name))
+        if device is not None:
+            devices.append(device)
+    return devices
+
+
+def read_sysfs_device(path):
+    """Return the UsbDevice of a sysfs device directory, or None"""
+    vendor_id = _read_attribute(path, "idVendor")
+    product_id = _read_attribute(path, "idProduct")
+    if vendor_id is None or product_id is None:
+        return None
+    interfaces = _read_attribute(path, "bNumInterfaces")
+    return UsbDevice(
+        _read_attribute(path, "manufacturer"),
+        _read_attribute(path, "product"),
+        int(vendor_id, 16), int(product_id, 16),
+        int(interfaces) if interfaces else None)
+
+
+def _enumerate_linux():
+    """Return a UsbDevice for every USB device on Linux using pyusb"""
+    import usb.core
+    devices = list()
+    for device in usb.core.find(find_all=True):
+        try:
+            vendor, product = device.manufacturer, device.product
+        except ValueError:  # No permission to read the descriptors
+            continue
+        try:
+            interfaces = device.get_active_configuration().bNumInterfaces
+        except usb.core.USBError:
+            interfaces = None
+        devices.append(UsbDevice(
+            vendor, product, device.idVendor, device.idProduct, interfaces))
+    return devices
+
+
+def get_device_list(vendors, inventory=None):
+    """
+    Return a list of Devices with a specific list of vendors
 
-    return device_list
+    :param inventory: Inventory to take the devices from, a new
+        snapshot is taken if not given
+    """
+    if inventory is None:
+        inventory = Inventory.snapshot()
+    return inventory.device_list(vendors)
@@ -3,6 +3,9 @@ Author: RedFantom
 License: GNU GPLv3
 Copyright (c) 2017-2018 RedFantom
 """
+# Standard Library
+from ctypes import CFUNCTYPE, POINTER, c_bool, c_int, c_void_p, cdll
+import logging
 # Packages
 from cue_sdk.api import *
 from cue_sdk.structures import *
@@ -11,6 +14,10 @@ from cue_sdk.enumerations import *
 from .keys import *
 # Project Modules
 from rgbkeyboards.keyboard import BaseKeyboard
+from rgbkeyboards.keygroups import build_table, translate
+
+# void (*CallbackType)(void* context, bool result, CorsairError error)
+CALLBACK = CFUNCTYPE(None, c_void_p, c_bool, c_int)
 
 
 class Keyboard(BaseKeyboard):
@@ -19,11 +26,40 @@ class Keyboard(BaseKeyboard):
 
     Relies on the cue_sdk Python wrapper of the Corsair CUE SDK DLL
     file. cue_sdk uses ctypes to handle the CUE SDK DLL file.
+
+    Colors are written into arrays of CorsairLedColor that are allocated
+    once and reused, also across enables so that an asynchronous call
+    still pending from an earlier session releases its array into the
+    same pool. Only the LEDs that change are submitted, directly to the
+    DLL. In asynchronous mode the colors are submitted with
+    CorsairSetLedsColorsAsync, which returns without waiting for the CUE
+    service. An array is not reused until its call has completed, and a
+    failed call is logged and makes the colors of all keys unknown.
     """
 
-    def _setup_lib(self, path):
-        """Initialize CUESDK instance with DLL path"""
+    def _setup_lib(self, path, asynchronous=False):
+        """
+        Initialize CUESDK instance with DLL path
+
+        :param asynchronous: Whether to submit colors asynchronously
+        """
         self._library = CUESDK(path, silence_errors=True)
+        self._dll = dll = cdll.LoadLibrary(path)
+        # bool CorsairSetLedsColors(int size, CorsairLedColor* ledsColors)
+        dll.CorsairSetLedsColors.restype = c_bool
+        dll.CorsairSetLedsColors.argtypes = [c_int, POINTER(CorsairLedColor)]
+        # bool CorsairSetLedsColorsAsync(int size, CorsairLedColor* ledsColors,
+        #    void (*CallbackType)(void*, bool, CorsairError), void* context)
+        dll.CorsairSetLedsColorsAsync.restype = c_bool
+        dll.CorsairSetLedsColorsAsync.argtypes = \
+            [c_int, POINTER(CorsairLedColor), CALLBACK, c_void_p]
+        self._asynchronous = asynchronous
+        self._callback = CALLBACK(self._on_done)  # Reference must be kept
+        self._leds = None  # LED id of every key id
+        self._all_leds = [led for led in keys.values() if led is not None]
+        # Arrays of CorsairLedColor by index
+        self._buffers = [(CorsairLedColor * len(self._all_leds))()]
+        self._free = [0]  # Indices of the arrays not in use
 
     def _get_device_available(self):
         """Return the availability of any supported device"""
@@ -31,7 +67,10 @@ class Keyboard(BaseKeyboard):
 
     def _enable_control(self):
         """Enable exclusive lighting control for a Corsair keyboard"""
-        return self._library.request_control(CAM.ExclusiveLightingControl)
+        r = self._library.request_control(CAM.ExclusiveLightingControl)
+        if r:
+            self._leds = build_table(keys)
+        return r
 
     def _disable_control(self):
         """Disable exclusive lighting control for controlled keyboard"""
@@ -39,8 +78,7 @@ class Keyboard(BaseKeyboard):
 
     def _set_full_color(self, r, g, b):
         """Set the color of all the LEDs on the controlled keyboard"""
-        return self._library.set_led_colors(
-            [CorsairLedColor(i, r, g, b) for i in keys.values()])
+        return self._set_leds((led, r, g, b) for led in self._all_leds)
 
     def _set_ind_color(self, leds):
         """
@@ -48,15 +86,56 @@ class Keyboard(BaseKeyboard):
         :param leds: dictionary with keynames as key and tuples (r, g, b) as values
         :return:
         """
-        parameter = []
-        for key, value in leds.items():
-            if keys[key] is None:
-                return
-            (r, g, b) = value
-            parameter.append(CorsairLedColor(keys[key], r, g, b))
-        return self._library.set_led_colors(parameter)
+        return self._set_leds(
+            (led, r, g, b) for led, (r, g, b) in translate(self._leds, leds))
+
+    def _set_frame(self, frame, indices):
+        """Set the colors of the changed keys of a KeyFrame"""
+        buf, table = frame.buffer, self._leds
+        return self._set_leds(
+            (table[i], buf[3 * i], buf[3 * i + 1], buf[3 * i + 2])
+            for i in indices if table[i] is not None)
+
+    def _set_leds(self, colors):
+        """Write (led, r, g, b) tuples into a free array and submit it"""
+        index = self._acquire()
+        buffer = self._buffers[index]
+        count = 0
+        for led, r, g, b in colors:
+            color = buffer[count]
+            color.ledId, color.r, color.g, color.b = led, r, g, b
+            count += 1
+        if count == 0:
+            self._free.append(index)
+            return True
+        if not self._asynchronous:
+            r = self._dll.CorsairSetLedsColors(count, buffer)
+            self._free.append(index)
+            return r
+        # The context is offset by one as a NULL pointer arrives as None
+        r = self._dll.CorsairSetLedsColorsAsync(count, buffer, self._callback, index + 1)
+        if r is False:
+            self._free.append(index)
+        return r
+
+    def _acquire(self):
+        """Return the index of an array not in use, allocate if none"""
+        try:
+            return self._free.pop()
+        except IndexError:
+            self._buffers.append((CorsairLedColor * len(self._all_leds))())
+            return len(self._buffers) - 1
+
+    def _on_done(self, context, result, error):
+        """Release the array of a completed asynchronous call"""
+        self._free.append(context - 1)
+        if result:
+            return
+        logging.warning("[Corsair RGB Keyboard Backend] Asynchronous "
+                        "color update failed with error {}".format(error))
+        self._request_invalidate()
 
     @staticmethod
-    def is_product_supported(product):
+    def is_product_supported(product, inventory=None):
         """Determine whether a product is supported based on USB string"""
         return "RGB" in product
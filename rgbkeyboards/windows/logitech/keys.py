@@ -117,3 +117,121 @@ keys = {
     '(.)': NUM_PERIOD,
     '(00)': None
 }
+
+# Position (row, column) of the keys in the LogiLed bitmap of the
+# standard full-size layout. Only models with per-key lighting have a
+# bitmap table, and a model with a layout that puts keys in different
+# positions in the bitmap should get its own table.
+bitmap = {
+    'esc': (0, 0),
+    'F1': (0, 1),
+    'F2': (0, 2),
+    'F3': (0, 3),
+    'F4': (0, 4),
+    'F5': (0, 5),
+    'F6': (0, 6),
+    'F7': (0, 7),
+    'F8': (0, 8),
+    'F9': (0, 9),
+    'F10': (0, 10),
+    'F11': (0, 11),
+    'F12': (0, 12),
+    'printscreen': (0, 13),
+    'scrolllock': (0, 14),
+    'pause': (0, 15),
+    '`': (1, 0),
+    '1': (1, 1),
+    '2': (1, 2),
+    '3': (1, 3),
+    '4': (1, 4),
+    '5': (1, 5),
+    '6': (1, 6),
+    '7': (1, 7),
+    '8': (1, 8),
+    '9': (1, 9),
+    '0': (1, 10),
+    '-': (1, 11),
+    '=': (1, 12),
+    'backspace': (1, 13),
+    'insert': (1, 14),
+    'home': (1, 15),
+    'pageup': (1, 16),
+    'numlock': (1, 17),
+    '(/)': (1, 18),
+    '(*)': (1, 19),
+    '(-)': (1, 20),
+    'tab': (2, 0),
+    'q': (2, 1),
+    'w': (2, 2),
+    'e': (2, 3),
+    'r': (2, 4),
+    't': (2, 5),
+    'y': (2, 6),
+    'u': (2, 7),
+    'i': (2, 8),
+    'o': (2, 9),
+    'p': (2, 10),
+    '[': (2, 11),
+    ']': (2, 12),
+    '\\': (2, 13),
+    'delete': (2, 14),
+    'end': (2, 15),
+    'pagedown': (2, 16),
+    '(7)': (2, 17),
+    '(8)': (2, 18),
+    '(9)': (2, 19),
+    '(+)': (2, 20),
+    'capslock': (3, 0),
+    'a': (3, 1),
+    's': (3, 2),
+    'd': (3, 3),
+    'f': (3, 4),
+    'g': (3, 5),
+    'h': (3, 6),
+    'j': (3, 7),
+    'k': (3, 8),
+    'l': (3, 9),
+    ';': (3, 10),
+    '\'': (3, 11),
+    'enter': (3, 13),
+    '(4)': (3, 17),
+    '(5)': (3, 18),
+    '(6)': (3, 19),
+    'shift_l': (4, 0),
+    'eu': (4, 1),
+    'z': (4, 2),
+    'x': (4, 3),
+    'c': (4, 4),
+    'v': (4, 5),
+    'b': (4, 6),
+    'n': (4, 7),
+    'm': (4, 8),
+    ',': (4, 9),
+    '.': (4, 10),
+    '/': (4, 11),
+    'shift_r': (4, 13),
+    'up': (4, 15),
+    '(1)': (4, 17),
+    '(2)': (4, 18),
+    '(3)': (4, 19),
+    '(enter)': (4, 20),
+    'ctrl_l': (5, 0),
+    'win_l': (5, 1),
+    'alt_l': (5, 2),
+    'space': (5, 5),
+    'alt_r': (5, 11),
+    'win_r': (5, 12),
+    'app': (5, 13),
+    'ctrl_r': (5, 14),
+    'left': (5, 15),
+    'down': (5, 16),
+    'right': (5, 17),
+    '(0)': (5, 18),
+    '(.)': (5, 20),
+}
+
+bitmaps = {
+    "G910": bitmap,
+    "G810": bitmap,
+    "G610": bitmap,
+}
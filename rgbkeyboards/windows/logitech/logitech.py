@@ -4,14 +4,17 @@ License: GNU GPLv3
 Copyright (c) 2017-2018 RedFantom
 """
 # Standard Library
-from ctypes import cdll, c_bool, c_int
+from ctypes import POINTER, cdll, c_bool, c_int, c_ubyte
 # Backend Modules
 from . import keys
 # Project Modules
+from rgbkeyboards import registry
 from rgbkeyboards.keyboard import BaseKeyboard
-from rgbkeyboards.utilities import get_device_list
+from rgbkeyboards.keygroups import build_table, key_ids
+from rgbkeyboards.utilities import Inventory
 
 _MODELS = [
+    # Matched by product string for product ids not in the registry
     # Not all models in the list support per-key RGB lighting
     # Monochrome devices use the maximum of the color tuple as brightness
     # Some monochrome devices do not support the full 100-level resolution
@@ -27,6 +30,10 @@ _MODELS = [
     "G15"
 ]
 
+# LogiLed bitmap of BGRA pixels, one pixel per key position
+BITMAP_WIDTH, BITMAP_HEIGHT, BITMAP_BYTES_PER_KEY = 21, 6, 4
+BITMAP_SIZE = BITMAP_WIDTH * BITMAP_HEIGHT * BITMAP_BYTES_PER_KEY
+
 
 class Keyboard(BaseKeyboard):
     """
@@ -35,14 +42,32 @@ class Keyboard(BaseKeyboard):
     Uses the LogiLed SDK DLL files to control the Logitech keyboards.
     The SDK has to be in the file provided upon class initialization.
     Note that the SDK DLL file depends on the Logitech Gaming Software.
+
+    In bitmap mode, the colors of individual keys are set with a single
+    LogiLedSetLightingFromBitmap call instead of a call per key. The
+    position of the keys in the bitmap differs across models, so bitmap
+    mode is only used for models with a table in keys.bitmaps. As the
+    bitmap sets all keys, it is only sent once it holds the color of
+    every key, after a full color or a complete frame.
     """
 
     VENDOR = "Logitech, Inc."
 
-    def _setup_lib(self, path):
-        """Load and initialize library function from DLL"""
+    def _setup_lib(self, path, bitmap=False):
+        """
+        Load and initialize library function from DLL
+
+        :param bitmap: Whether to use bitmap mode if the model supports
+            it, see the class docstring
+        """
         self._library = lib = cdll.LoadLibrary(path)
         self._init = False
+        self._keycodes = None  # LogiLed key code of every key id
+        self._bitmap_mode = bitmap
+        self._bitmap = bytearray(b"\x00\x00\x00\xff" * (BITMAP_SIZE // 4))
+        self._bitmap_buffer = (c_ubyte * BITMAP_SIZE).from_buffer(self._bitmap)
+        self._offsets = None  # Bitmap offset of every key id
+        self._bitmap_valid = False  # Bitmap holds the color of all keys
         # bool LogiLedInit()
         lib.LogiLedInit.restype = c_bool
         # bool LogiLedSetTargetDevice(int targetDevice)
@@ -55,6 +80,9 @@ class Keyboard(BaseKeyboard):
         #    enum KeyName keyName, int r, int g, int b)
         lib.LogiLedSetLightingForKeyWithKeyName.restype = c_bool
         lib.LogiLedSetLightingForKeyWithKeyName.argtypes = [c_int] * 4
+        # bool LogiLedSetLightingFromBitmap(unsigned char bitmap[])
+        lib.LogiLedSetLightingFromBitmap.restype = c_bool
+        lib.LogiLedSetLightingFromBitmap.argtypes = [POINTER(c_ubyte)]
         # bool LogiLedShutdown()
         lib.LogiLedShutdown.restype = c_bool
 
@@ -66,14 +94,38 @@ class Keyboard(BaseKeyboard):
         keyboards, thus the keyboards have to be detected in a more
         complicated manner.
         """
-        devices = get_device_list([Keyboard.VENDOR])
-        if len(devices) == 0:
-            return False
-        return any(self.is_product_supported(product) for _, product in devices)
+        return len(self._get_models()) != 0
+
+    @staticmethod
+    def _get_models():
+        """Return the names of the connected supported models"""
+        inventory = Inventory.snapshot()
+        models = [model.name for _, model in registry.find(inventory, registry.LOGITECH)]
+        if len(models) != 0:
+            return models
+        return [name for _, product in inventory.device_list([Keyboard.VENDOR])
+                for name in _MODELS if name in (product or "")]
+
+    def _get_bitmap_model(self):
+        """Return the first connected model with a bitmap table or None"""
+        for model in self._get_models():
+            if model in keys.bitmaps:
+                return model
+        return None
 
     def _enable_control(self):
         """Enable control by initializing LogiLed connection"""
-        return self._library.LogiLedInit()
+        r = self._library.LogiLedInit()
+        if not r:
+            return r
+        self._keycodes = build_table(keys.keys)
+        self._offsets, self._bitmap_valid = None, False
+        model = self._get_bitmap_model() if self._bitmap_mode else None
+        if model is not None:
+            self._offsets = build_table({
+                key: BITMAP_BYTES_PER_KEY * (row * BITMAP_WIDTH + column)
+                for key, (row, column) in keys.bitmaps[model].items()})
+        return r
 
     def _disable_control(self):
         """Disable control by closing the LogiLed connection"""
@@ -81,31 +133,69 @@ class Keyboard(BaseKeyboard):
 
     def _set_full_color(self, r, g, b):
         """Set the color of all the LEDs on the keyboard"""
-        r, g, b = map(self._scale, (r, g, b))
-        return self._library.LogiLedSetLighting(r, g, b)
+        result = self._library.LogiLedSetLighting(*map(self._scale, (r, g, b)))
+        if self._offsets is not None:
+            self._bitmap[:] = bytearray((b, g, r, 0xff)) * (BITMAP_SIZE // 4)
+            self._bitmap_valid = result is not False
+        return result
 
     def _set_ind_color(self, leds):
+        """Set the colors of individual LEDs on the keyboard"""
+        return self._set_keys([(key_ids[key], color) for key, color in leds.items()
+                               if key in key_ids])
+
+    def _set_frame(self, frame, indices):
+        """Set the colors of the changed keys of a KeyFrame"""
+        buf = frame.buffer
+        return self._set_keys(
+            [(i, (buf[3 * i], buf[3 * i + 1], buf[3 * i + 2])) for i in indices],
+            complete=len(indices) == len(self._keycodes))
+
+    def _set_keys(self, items, complete=False):
         """
-        Set the colors of individual LEDs on the keyboard
+        Set the colors of keys by bitmap or by individual key
 
-        Note that this function does not use the
-        LogiLedSetLightingWithBitmap library function because its
-        behaviour is inconsistent across devices (the matrix has
-        different keys in the same coordinates across layouts).
+        :param items: List of (key id, (r, g, b)) pairs
+        :param complete: Whether items covers all keys, which makes the
+            bitmap valid to send even if it was not before
         """
-        for keyname, (r, g, b) in leds.items():
-            r, g, b = map(self._scale, (r, g, b))
-            keycode = keys.keys[keyname]
+        offsets = self._offsets
+        if offsets is not None:
+            bitmap = self._bitmap
+            for i, (r, g, b) in items:
+                j = offsets[i]
+                if j is not None:
+                    bitmap[j:j + 3] = (b, g, r)
+            if complete:
+                self._bitmap_valid = True
+            if self._bitmap_valid:
+                result = self._library.LogiLedSetLightingFromBitmap(self._bitmap_buffer)
+                self._bitmap_valid = result is not False
+                return result
+        table, scale = self._keycodes, self._scale
+        for i, (r, g, b) in items:
+            keycode = table[i]
             if not keycode:
                 continue
-            result = self._library.LogiLedSetLightingWithKeyName(keycode, r, g, b)
+            result = self._library.LogiLedSetLightingForKeyWithKeyName(
+                keycode, scale(r), scale(g), scale(b))
             if result is False:
+                self._bitmap_valid = False
                 return False
         return True
 
     @staticmethod
-    def is_product_supported(product):
-        """Determine whether a product is supported based on product string"""
+    def is_product_supported(product, inventory=None):
+        """
+        Determine whether a product is supported based on product string
+
+        The product ids of the devices with the product string in the
+        inventory are looked up in the registry first.
+        """
+        if inventory is not None:
+            for device in inventory.with_product(product):
+                if registry.lookup(device.vendor_id, device.product_id) is not None:
+                    return True
         return any(k in product for k in _MODELS)
 
     @staticmethod
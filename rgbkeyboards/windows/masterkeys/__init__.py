@@ -5,6 +5,5 @@ Copyright (c) 2017-2018 RedFantom
 
 Back-end supporting all Cooler Master MasterKeys keyboards.
 TODO: Implement support for Japanese keyboard layouts
-TODO: Implement support for the COLOR_MATRIX struct
 """
 from .masterkeys import Keyboard
@@ -3,704 +3,4 @@ Author: RedFantom
 License: GNU GPLv3
 Copyright (c) 2017-2018 RedFantom
 """
-L, M, S = 0, 1, 2
-EU, US = 2, 1
-UNDEFINED = 0
-
-LAYOUTS = {
-    L: {
-        EU: {
-            'esc': (0, 0),
-            'F1': (0, 1),
-            'F2': (0, 2),
-            'F3': (0, 3),
-            'F4': (0, 4),
-            'F5': (0, 6),
-            'F6': (0, 7),
-            'F7': (0, 8),
-            'F8': (0, 9),
-            'F9': (0, 11),
-            'F10': (0, 12),
-            'F11': (0, 13),
-            'F12': (0, 14),
-            'printscreen': (0, 15),
-            'scrolllock': (0, 16),
-            'pause': (0, 17),
-            'P1': (0, 18),
-            'P2': (0, 19),
-            'P3': (0, 20),
-            'P4': (0, 21),
-            '`': (1, 0),
-            '1': (1, 1),
-            '2': (1, 2),
-            '3': (1, 3),
-            '4': (1, 4),
-            '5': (1, 5),
-            '6': (1, 6),
-            '7': (1, 7),
-            '8': (1, 8),
-            '9': (1, 9),
-            '0': (1, 10),
-            '-': (1, 11),
-            '=': (1, 12),
-            'backspace': (1, 14),
-            'insert': (1, 15),
-            'home': (1, 16),
-            'pageup': (1, 17),
-            'numlock': (1, 18),
-            '(/)': (1, 19),
-            '(*)': (1, 20),
-            '(-)': (1, 21),
-            'tab': (2, 0),
-            'q': (2, 1),
-            'w': (2, 2),
-            'e': (2, 3),
-            'r': (2, 4),
-            't': (2, 5),
-            'y': (2, 6),
-            'u': (2, 7),
-            'i': (2, 8),
-            'o': (2, 9),
-            'p': (2, 10),
-            '[': (2, 11),
-            ']': (2, 12),
-            'enter': (2, 14),
-            'delete': (2, 15),
-            'end': (2, 16),
-            'pagedown': (2, 17),
-            '(7)': (2, 18),
-            '(8)': (2, 19),
-            '(9)': (2, 20),
-            '(+)': (2, 21),
-            'capslock': (3, 0),
-            'a': (3, 1),
-            's': (3, 2),
-            'd': (3, 3),
-            'f': (3, 4),
-            'g': (3, 5),
-            'h': (3, 6),
-            'j': (3, 7),
-            'k': (3, 8),
-            'l': (3, 9),
-            ';': (3, 10),
-            '\'': (3, 11),
-            '\\': (3, 12),
-            '(4)': (3, 18),
-            '(5)': (3, 19),
-            '(6)': (3, 20),
-            'shift_l': (4, 0),
-            'eu': (4, 1),
-            'z': (4, 2),
-            'x': (4, 3),
-            'c': (4, 4),
-            'v': (4, 5),
-            'b': (4, 6),
-            'n': (4, 7),
-            'm': (4, 8),
-            ',': (4, 9),
-            '.': (4, 10),
-            '/': (4, 11),
-            'shift_r': (4, 14),
-            'up': (4, 16),
-            '(1)': (4, 18),
-            '(2)': (4, 19),
-            '(3)': (4, 20),
-            '(enter)': (4, 21),
-            'ctrl_l': (5, 0),
-            'win_l': (5, 1),
-            'alt_l': (5, 2),
-            'space': (5, 6),
-            'alt_r': (5, 10),
-            'win_r': (5, 11),
-            'app': (5, 12),
-            'ctrl_r': (5, 14),
-            'left': (5, 15),
-            'down': (5, 16),
-            'right': (5, 18),
-            '(0)': (5, 19),
-            '(.)': (5, 20),
-            '(00)': None
-        },
-        US: {
-            'esc': (0, 0),
-            'F1': (0, 1),
-            'F2': (0, 2),
-            'F3': (0, 3),
-            'F4': (0, 4),
-            'F5': (0, 6),
-            'F6': (0, 7),
-            'F7': (0, 8),
-            'F8': (0, 9),
-            'F9': (0, 11),
-            'F10': (0, 12),
-            'F11': (0, 13),
-            'F12': (0, 14),
-            'printscreen': (0, 15),
-            'scrolllock': (0, 16),
-            'pause': (0, 17),
-            'P1': (0, 18),
-            'P2': (0, 19),
-            'P3': (0, 20),
-            'P4': (0, 21),
-            '`': (1, 0),
-            '1': (1, 1),
-            '2': (1, 2),
-            '3': (1, 3),
-            '4': (1, 4),
-            '5': (1, 5),
-            '6': (1, 6),
-            '7': (1, 7),
-            '8': (1, 8),
-            '9': (1, 9),
-            '0': (1, 10),
-            '-': (1, 11),
-            '=': (1, 12),
-            'backspace': (1, 14),
-            'insert': (1, 15),
-            'home': (1, 16),
-            'pageup': (1, 17),
-            'numlock': (1, 18),
-            '(/)': (1, 19),
-            '(*)': (1, 20),
-            '(-)': (1, 21),
-            'tab': (2, 0),
-            'q': (2, 1),
-            'w': (2, 2),
-            'e': (2, 3),
-            'r': (2, 4),
-            't': (2, 5),
-            'y': (2, 6),
-            'u': (2, 7),
-            'i': (2, 8),
-            'o': (2, 9),
-            'p': (2, 10),
-            '[': (2, 11),
-            ']': (2, 12),
-            '\\': (2, 14),
-            'delete': (2, 15),
-            'end': (2, 16),
-            'pagedown': (2, 17),
-            '(7)': (2, 18),
-            '(8)': (2, 19),
-            '(9)': (2, 20),
-            '(+)': (2, 21),
-            'capslock': (3, 0),
-            'a': (3, 1),
-            's': (3, 2),
-            'd': (3, 3),
-            'f': (3, 4),
-            'g': (3, 5),
-            'h': (3, 6),
-            'j': (3, 7),
-            'k': (3, 8),
-            'l': (3, 9),
-            ';': (3, 10),
-            '\'': (3, 11),
-            'enter': (3, 14),
-            '(4)': (3, 18),
-            '(5)': (3, 19),
-            '(6)': (3, 20),
-            'shift_l': (4, 0),
-            'z': (4, 2),
-            'x': (4, 3),
-            'c': (4, 4),
-            'v': (4, 5),
-            'b': (4, 6),
-            'n': (4, 7),
-            'm': (4, 8),
-            ',': (4, 9),
-            '.': (4, 10),
-            '/': (4, 11),
-            'shift_r': (4, 14),
-            'up': (4, 16),
-            '(1)': (4, 18),
-            '(2)': (4, 19),
-            '(3)': (4, 20),
-            '(enter)': (4, 21),
-            'ctrl_l': (5, 0),
-            'win_l': (5, 1),
-            'alt_l': (5, 2),
-            'space': (5, 6),
-            'alt_r': (5, 10),
-            'win_r': (5, 11),
-            'app': (5, 12),
-            'ctrl_r': (5, 14),
-            'left': (5, 15),
-            'down': (5, 16),
-            'right': (5, 18),
-            '(0)': (5, 19),
-            '(.)': (5, 20),
-            'eu': None,
-            '(00)': None
-        },
-    },
-    M: {
-        US: {
-            'esc': (0, 0),
-            'F1': (0, 1),
-            'F2': (0, 2),
-            'F3': (0, 3),
-            'F4': (0, 4),
-            'F5': (0, 6),
-            'F6': (0, 7),
-            'F7': (0, 8),
-            'F8': (0, 9),
-            'F9': (0, 11),
-            'F10': (0, 12),
-            'F11': (0, 13),
-            'F12': (0, 14),
-            'printscreen': None,
-            'scrolllock': None,
-            'pause': None,
-            'P1': None,
-            'P2': None,
-            'P3': None,
-            'P4': None,
-            '`': (1, 0),
-            '1': (1, 1),
-            '2': (1, 2),
-            '3': (1, 3),
-            '4': (1, 4),
-            '5': (1, 5),
-            '6': (1, 6),
-            '7': (1, 7),
-            '8': (1, 8),
-            '9': (1, 9),
-            '0': (1, 10),
-            '-': (1, 11),
-            '=': (1, 12),
-            'backspace': (1, 14),
-            'insert': None,
-            'home': None,
-            'pageup': None,
-            'numlock': (1, 15),
-            '(/)': (1, 16),
-            '(*)': (1, 17),
-            '(-)': (1, 18),
-            'tab': (2, 0),
-            'q': (2, 1),
-            'w': (2, 2),
-            'e': (2, 3),
-            'r': (2, 4),
-            't': (2, 5),
-            'y': (2, 6),
-            'u': (2, 7),
-            'i': (2, 8),
-            'o': (2, 9),
-            'p': (2, 10),
-            '[': (2, 11),
-            ']': (2, 12),
-            '\\': (2, 14),
-            'delete': None,
-            'end': None,
-            'pagedown': None,
-            '(7)': (2, 15),
-            '(8)': (2, 16),
-            '(9)': (2, 17),
-            '(+)': (2, 18),
-            'capslock': (3, 0),
-            'a': (3, 1),
-            's': (3, 2),
-            'd': (3, 3),
-            'f': (3, 4),
-            'g': (3, 5),
-            'h': (3, 6),
-            'j': (3, 7),
-            'k': (3, 8),
-            'l': (3, 9),
-            ';': (3, 10),
-            '\'': (3, 11),
-            'enter': (3, 14),
-            '(4)': (3, 15),
-            '(5)': (3, 16),
-            '(6)': (3, 17),
-            'shift_l': (4, 0),
-            'z': (4, 2),
-            'x': (4, 3),
-            'c': (4, 4),
-            'v': (4, 5),
-            'b': (4, 6),
-            'n': (4, 7),
-            'm': (4, 8),
-            ',': (4, 9),
-            '.': (4, 10),
-            '/': (4, 11),
-            'shift_r': (4, 14),
-            'up': None,
-            '(1)': (4, 15),
-            '(2)': (4, 16),
-            '(3)': (4, 17),
-            '(enter)': (4, 18),
-            'ctrl_l': (5, 0),
-            'win_l': (5, 1),
-            'alt_l': (5, 2),
-            'space': (5, 6),
-            'alt_r': (5, 10),
-            'win_r': (5, 11),
-            'app': (5, 12),
-            'ctrl_r': (5, 14),
-            'left': None,
-            'down': None,
-            'right': None,
-            '(0)': (5, 16),
-            '(00)': (5, 17),
-            '(.)': (5, 18),
-            'eu': None
-        },
-        EU: {
-            'esc': (0, 0),
-            'F1': (0, 1),
-            'F2': (0, 2),
-            'F3': (0, 3),
-            'F4': (0, 4),
-            'F5': (0, 6),
-            'F6': (0, 7),
-            'F7': (0, 8),
-            'F8': (0, 9),
-            'F9': (0, 11),
-            'F10': (0, 12),
-            'F11': (0, 13),
-            'F12': (0, 14),
-            'printscreen': None,
-            'scrolllock': None,
-            'pause': None,
-            'P1': None,
-            'P2': None,
-            'P3': None,
-            'P4': None,
-            '`': (1, 0),
-            '1': (1, 1),
-            '2': (1, 2),
-            '3': (1, 3),
-            '4': (1, 4),
-            '5': (1, 5),
-            '6': (1, 6),
-            '7': (1, 7),
-            '8': (1, 8),
-            '9': (1, 9),
-            '0': (1, 10),
-            '-': (1, 11),
-            '=': (1, 12),
-            'backspace': (1, 14),
-            'insert': None,
-            'home': None,
-            'pageup': None,
-            'numlock': (1, 15),
-            '(/)': (1, 16),
-            '(*)': (1, 17),
-            '(-)': (1, 18),
-            'tab': (2, 0),
-            'q': (2, 1),
-            'w': (2, 2),
-            'e': (2, 3),
-            'r': (2, 4),
-            't': (2, 5),
-            'y': (2, 6),
-            'u': (2, 7),
-            'i': (2, 8),
-            'o': (2, 9),
-            'p': (2, 10),
-            '[': (2, 11),
-            ']': (2, 12),
-            'enter': (2, 14),
-            'delete': None,
-            'end': None,
-            'pagedown': None,
-            '(7)': (2, 15),
-            '(8)': (2, 16),
-            '(9)': (2, 17),
-            '(+)': (2, 18),
-            'capslock': (3, 0),
-            'a': (3, 1),
-            's': (3, 2),
-            'd': (3, 3),
-            'f': (3, 4),
-            'g': (3, 5),
-            'h': (3, 6),
-            'j': (3, 7),
-            'k': (3, 8),
-            'l': (3, 9),
-            ';': (3, 10),
-            '\'': (3, 11),
-            '\\': (3, 12),
-            '(4)': (3, 15),
-            '(5)': (3, 16),
-            '(6)': (3, 17),
-            'shift_l': (4, 0),
-            'z': (4, 2),
-            'x': (4, 3),
-            'c': (4, 4),
-            'v': (4, 5),
-            'b': (4, 6),
-            'n': (4, 7),
-            'm': (4, 8),
-            ',': (4, 9),
-            '.': (4, 10),
-            '/': (4, 11),
-            'shift_r': (4, 14),
-            'up': None,
-            '(1)': (4, 15),
-            '(2)': (4, 16),
-            '(3)': (4, 17),
-            '(enter)': (4, 18),
-            'ctrl_l': (5, 0),
-            'win_l': (5, 1),
-            'alt_l': (5, 2),
-            'space': (5, 6),
-            'alt_r': (5, 10),
-            'win_r': (5, 11),
-            'app': (5, 12),
-            'ctrl_r': (5, 14),
-            'left': None,
-            'down': None,
-            'right': None,
-            '(0)': (5, 16),
-            '(00)': (5, 17),
-            '(.)': (5, 18),
-            'eu': (4, 1)
-        },
-    },
-    S: {
-        US: {
-            'esc': (0, 0),
-            'F1': (0, 1),
-            'F2': (0, 2),
-            'F3': (0, 3),
-            'F4': (0, 4),
-            'F5': (0, 6),
-            'F6': (0, 7),
-            'F7': (0, 8),
-            'F8': (0, 9),
-            'F9': (0, 11),
-            'F10': (0, 12),
-            'F11': (0, 13),
-            'F12': (0, 14),
-            'printscreen': (0, 15),
-            'scrolllock': (0, 16),
-            'pause': (0, 17),
-            'P1': None,
-            'P2': None,
-            'P3': None,
-            'P4': None,
-            '`': (1, 0),
-            '1': (1, 1),
-            '2': (1, 2),
-            '3': (1, 3),
-            '4': (1, 4),
-            '5': (1, 5),
-            '6': (1, 6),
-            '7': (1, 7),
-            '8': (1, 8),
-            '9': (1, 9),
-            '0': (1, 10),
-            '-': (1, 11),
-            '=': (1, 12),
-            'backspace': (1, 14),
-            'insert': (1, 15),
-            'home': (1, 16),
-            'pageup': (1, 17),
-            'numlock': None,
-            '(/)': None,
-            '(*)': None,
-            '(-)': None,
-            'tab': (2, 0),
-            'q': (2, 1),
-            'w': (2, 2),
-            'e': (2, 3),
-            'r': (2, 4),
-            't': (2, 5),
-            'y': (2, 6),
-            'u': (2, 7),
-            'i': (2, 8),
-            'o': (2, 9),
-            'p': (2, 10),
-            '[': (2, 11),
-            ']': (2, 12),
-            '\\': (2, 14),
-            'delete': (2, 15),
-            'end': (2, 16),
-            'pagedown': (2, 17),
-            '(7)': None,
-            '(8)': None,
-            '(9)': None,
-            '(+)': None,
-            'capslock': (3, 0),
-            'a': (3, 1),
-            's': (3, 2),
-            'd': (3, 3),
-            'f': (3, 4),
-            'g': (3, 5),
-            'h': (3, 6),
-            'j': (3, 7),
-            'k': (3, 8),
-            'l': (3, 9),
-            ';': (3, 10),
-            '\'': (3, 11),
-            'enter': (3, 14),
-            '(4)': None,
-            '(5)': None,
-            '(6)': None,
-            'shift_l': (4, 0),
-            'z': (4, 2),
-            'x': (4, 3),
-            'c': (4, 4),
-            'v': (4, 5),
-            'b': (4, 6),
-            'n': (4, 7),
-            'm': (4, 8),
-            ',': (4, 9),
-            '.': (4, 10),
-            '/': (4, 11),
-            'shift_r': (4, 14),
-            'up': (4, 16),
-            '(1)': None,
-            '(2)': None,
-            '(3)': None,
-            '(enter)': (4, 18),
-            'ctrl_l': (5, 0),
-            'win_l': (5, 1),
-            'alt_l': (5, 2),
-            'space': (5, 6),
-            'alt_r': (5, 10),
-            'win_r': (5, 11),
-            'app': (5, 12),
-            'ctrl_r': (5, 14),
-            'left': (5, 15),
-            'down': (5, 16),
-            'right': (5, 17),
-            '(0)': None,
-            '(00)': None,
-            '(.)': None,
-            'eu': None
-        },
-        EU: {
-            'esc': (0, 0),
-            'F1': (0, 1),
-            'F2': (0, 2),
-            'F3': (0, 3),
-            'F4': (0, 4),
-            'F5': (0, 6),
-            'F6': (0, 7),
-            'F7': (0, 8),
-            'F8': (0, 9),
-            'F9': (0, 11),
-            'F10': (0, 12),
-            'F11': (0, 13),
-            'F12': (0, 14),
-            'printscreen': (0, 15),
-            'scrolllock': (0, 16),
-            'pause': (0, 17),
-            'P1': None,
-            'P2': None,
-            'P3': None,
-            'P4': None,
-            '`': (1, 0),
-            '1': (1, 1),
-            '2': (1, 2),
-            '3': (1, 3),
-            '4': (1, 4),
-            '5': (1, 5),
-            '6': (1, 6),
-            '7': (1, 7),
-            '8': (1, 8),
-            '9': (1, 9),
-            '0': (1, 10),
-            '-': (1, 11),
-            '=': (1, 12),
-            'backspace': (1, 14),
-            'insert': (1, 15),
-            'home': (1, 16),
-            'pageup': (1, 17),
-            'numlock': None,
-            '(/)': None,
-            '(*)': None,
-            '(-)': None,
-            'tab': (2, 0),
-            'q': (2, 1),
-            'w': (2, 2),
-            'e': (2, 3),
-            'r': (2, 4),
-            't': (2, 5),
-            'y': (2, 6),
-            'u': (2, 7),
-            'i': (2, 8),
-            'o': (2, 9),
-            'p': (2, 10),
-            '[': (2, 11),
-            ']': (2, 12),
-            'enter': (2, 14),
-            'delete': (2, 15),
-            'end': (2, 16),
-            'pagedown': (2, 17),
-            '(7)': None,
-            '(8)': None,
-            '(9)': None,
-            '(+)': None,
-            'capslock': (3, 0),
-            'a': (3, 1),
-            's': (3, 2),
-            'd': (3, 3),
-            'f': (3, 4),
-            'g': (3, 5),
-            'h': (3, 6),
-            'j': (3, 7),
-            'k': (3, 8),
-            'l': (3, 9),
-            ';': (3, 10),
-            '\'': (3, 11),
-            '\\': (3, 12),
-            '(4)': None,
-            '(5)': None,
-            '(6)': None,
-            'shift_l': (4, 0),
-            'z': (4, 2),
-            'x': (4, 3),
-            'c': (4, 4),
-            'v': (4, 5),
-            'b': (4, 6),
-            'n': (4, 7),
-            'm': (4, 8),
-            ',': (4, 9),
-            '.': (4, 10),
-            '/': (4, 11),
-            'shift_r': (4, 14),
-            'up': (4, 16),
-            '(1)': None,
-            '(2)': None,
-            '(3)': None,
-            '(enter)': (4, 18),
-            'ctrl_l': (5, 0),
-            'win_l': (5, 1),
-            'alt_l': (5, 2),
-            'space': (5, 6),
-            'alt_r': (5, 10),
-            'win_r': (5, 11),
-            'app': (5, 12),
-            'ctrl_r': (5, 14),
-            'left': (5, 15),
-            'down': (5, 16),
-            'right': (5, 17),
-            '(0)': None,
-            '(00)': None,
-            '(.)': None,
-            'eu': (4, 1)
-        },
-    }
-}
-
-
-if __name__ == '__main__':
-    """Assures that all layouts defined also define all keys"""
-    keys = list()
-    for regions in LAYOUTS.values():
-        for layout in regions.values():
-            for key in layout.keys():
-                keys.append(key)
-    keys = list(set(keys))
-    for size, regions in LAYOUTS.items():
-        for region, layout in regions.items():
-            if len(layout) == 0:
-                continue
-            for key in keys:
-                if key not in layout:
-                    print("{}: {}: {}".format(size, region, key))
+from rgbkeyboards.layouts import *
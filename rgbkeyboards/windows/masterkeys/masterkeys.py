@@ -4,14 +4,28 @@ License: GNU GPLv3
 Copyright (c) 2017-2018 RedFantom
 """
 # Standard Library
-from ctypes import c_bool, c_int, c_void_p, c_byte
-from ctypes import cdll
+from ctypes import c_bool, c_int, c_void_p, c_byte, c_ubyte
+from ctypes import Structure, addressof, cdll, memmove, sizeof
 # Packages
 from enum import IntEnum
 # Backend Modules
 from .keys import *
 # Project Modules
 from rgbkeyboards.keyboard import BaseKeyboard
+from rgbkeyboards.keygroups import build_table, translate
+from rgbkeyboards.utilities import Inventory
+
+MAX_LED_ROW, MAX_LED_COLUMN = 6, 22
+
+
+class KEY_COLOR(Structure):
+    """Color of a single LED as defined in the SDK"""
+    _fields_ = [("r", c_ubyte), ("g", c_ubyte), ("b", c_ubyte)]
+
+
+class COLOR_MATRIX(Structure):
+    """Colors of all LEDs by (row, column) as defined in the SDK"""
+    _fields_ = [("KeyColor", KEY_COLOR * MAX_LED_COLUMN * MAX_LED_ROW)]
 
 
 class Keyboard(BaseKeyboard):
@@ -20,7 +34,15 @@ class Keyboard(BaseKeyboard):
 
     Relies on the official Cooler Master Custom Lighting SDK for Windows
     to control the MasterKeys keyboards.
+
+    The colors of all LEDs are kept in a COLOR_MATRIX that is updated in
+    place. Once it holds the color of every LED, an update of at least
+    MATRIX_THRESHOLD keys is committed with a single SetAllLedColor
+    call instead of a SetLedColor call per key.
     """
+    # Amount of changed keys from which the matrix is sent at once
+    MATRIX_THRESHOLD = 8
+
     # Keyboard types
     class KBType(IntEnum):
         RGB_L = 0
@@ -69,13 +91,16 @@ class Keyboard(BaseKeyboard):
         lib.SetFullLedColor.argtypes = [c_byte, c_byte, c_byte, c_int]
         # bool SetAllLedColor(COLOR_MATRIX, DEVICE_INDEX)
         lib.SetAllLedColor.restype = c_bool
-        # TODO: Implement COLOR_MATRIX in ctypes
+        lib.SetAllLedColor.argtypes = [COLOR_MATRIX, c_int]
         # bool SetLedColor(int, int, BYTE, BYTE, BYTE, DEVICE_INDEX)
         lib.SetLedColor.restype = c_bool
         lib.SetLedColor.argtypes = [c_int, c_int, c_byte, c_byte, c_byte, c_int]
 
         self._device = None
         self._layout = None
+        self._coords = None  # (row, column) of every key id
+        self._matrix = COLOR_MATRIX()
+        self._matrix_valid = False  # Matrix holds the color of all LEDs
 
     def _get_layout(self):
         """
@@ -104,7 +129,7 @@ class Keyboard(BaseKeyboard):
 
     def _set_control_device(self):
         """Select the first encountered keyboard for control"""
-        available_dev = self.get_device_available(True)
+        available_dev = self._get_device_available(True)
         if available_dev is None:
             return False
         r = self.library.SetControlDevice(available_dev)
@@ -114,6 +139,7 @@ class Keyboard(BaseKeyboard):
         self._layout = self._get_layout()
         if self._layout is None:
             return False
+        self._coords = build_table(self._layout)
         return True
 
     def _enable_control(self):
@@ -121,6 +147,7 @@ class Keyboard(BaseKeyboard):
         r = self._set_control_device()
         if r is False:  # Not device available or set device failed
             return False
+        self._matrix_valid = False
         return self.library.EnableLedControl(True, self._device)
 
     def _disable_control(self):
@@ -130,6 +157,7 @@ class Keyboard(BaseKeyboard):
         r = self.library.EnableLedControl(False, self._device)
         if r is True:
             self._device = None
+            self._matrix_valid = False
         return r
 
     def _set_full_color(self, r, g, b):
@@ -141,7 +169,14 @@ class Keyboard(BaseKeyboard):
         """
         if self._device is None:
             return False
-        return self.library.SetFullLedColor(r, g, b, self._device)
+        result = self.library.SetFullLedColor(r, g, b, self._device)
+        if result is False:
+            self._matrix_valid = False
+            return False
+        pattern = bytes(bytearray((r, g, b)) * (MAX_LED_ROW * MAX_LED_COLUMN))
+        memmove(addressof(self._matrix), pattern, sizeof(COLOR_MATRIX))
+        self._matrix_valid = True
+        return result
 
     def _set_ind_color(self, leds):
         """
@@ -150,20 +185,44 @@ class Keyboard(BaseKeyboard):
         Takes a dictionary with key names as keys and (r, g, b) byte
         tuples as values. Keys that are not in the dictionary do not
         change color.
-        # TODO: Implement support for SetAllLedColor with matrix
         """
-        for key, value in leds.items():
-            if self._layout[key] is None:
-                continue
-            row, column = self._layout[key]
-            r, g, b = value
-            r = self.library.SetLedColor(row, column, r, g, b, self._device)
-            if r is False:
-                return False
-        return True
+        return self._set_cells(translate(self._coords, leds))
+
+    def _set_frame(self, frame, indices):
+        """Set the colors of the changed keys of a KeyFrame"""
+        buf, table = frame.buffer, self._coords
+        cells = [(table[i], (buf[3 * i], buf[3 * i + 1], buf[3 * i + 2]))
+                 for i in indices if table[i] is not None]
+        return self._set_cells(cells, complete=len(indices) == len(table))
+
+    def _set_cells(self, cells, complete=False):
+        """
+        Set the color of LEDs by matrix or by individual LED
+
+        :param cells: List of ((row, column), (r, g, b)) pairs
+        :param complete: Whether cells covers all LEDs, which makes the
+            matrix valid to send even if it was not before
+        """
+        colors = self._matrix.KeyColor
+        for (row, column), (r, g, b) in cells:
+            cell = colors[row][column]
+            cell.r, cell.g, cell.b = r, g, b
+        if complete:
+            self._matrix_valid = True
+        if self._matrix_valid and len(cells) >= self.MATRIX_THRESHOLD:
+            result = self.library.SetAllLedColor(self._matrix, self._device)
+        else:
+            result = True
+            for (row, column), (r, g, b) in cells:
+                result = self.library.SetLedColor(row, column, r, g, b, self._device)
+                if result is False:
+                    break
+        if result is False:  # Unknown which LEDs have the matrix colors
+            self._matrix_valid = False
+        return result
 
     @staticmethod
-    def is_product_supported(product):
+    def is_product_supported(product, inventory=None):
         """
         Determine if a product is supported based on USB product string
 
@@ -172,14 +231,9 @@ class Keyboard(BaseKeyboard):
         descriptor strings for RGB and non-RGB supporting devices. Only
         if the device has three Endpoints does the device support
         lighting control. That is what is checked using this function,
-        but that does make it pretty slow.
+        using the interface counts of an Inventory snapshot.
         """
-        from pywinusb import hid
-        devices = hid.HidDeviceFilter().get_devices()
-        count = 0
-        for device in devices:
-            if not isinstance(device, hid.HidDevice):
-                continue
-            if device.product_name == product:
-                count += 1
-        return count == 3
+        if inventory is None:
+            inventory = Inventory.snapshot()
+        devices = inventory.with_product(product)
+        return sum(device.interfaces or 0 for device in devices) == 3
@@ -0,0 +1,30 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+
+Benchmark of device detection from a synthetic Inventory snapshot
+
+Run from the tests directory: python benchmark_inventory.py
+The time per device should stay constant as the amount of devices
+grows, as every back-end check is a lookup in the shared snapshot.
+"""
+# Standard Library
+import timeit
+# Project Modules
+from rgbkeyboards.keyboards import Keyboards
+from test_inventory import synthetic_inventory
+
+
+def main():
+    keyboards = Keyboards()
+    for n in (100, 200, 400, 800):
+        inventory = synthetic_inventory(n)
+        repeat = 20
+        t = timeit.timeit(lambda: keyboards.detect_devices(inventory), number=repeat)
+        print("{:4d} devices: {:8.3f} ms per detection, {:6.2f} us per device".format(
+            n, t / repeat * 1e3, t / repeat / n * 1e6))
+
+
+if __name__ == '__main__':
+    main()
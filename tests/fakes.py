@@ -0,0 +1,126 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+from collections import Counter
+from ctypes import Structure, c_int
+import sys
+import types
+# Project Modules
+from rgbkeyboards import BaseKeyboard
+
+
+class FakeKeyboard(BaseKeyboard):
+    """Back-end that records the calls made to it instead of a device"""
+
+    def _setup_lib(self):
+        self.calls = list()
+
+    def _get_device_available(self):
+        return True
+
+    def _enable_control(self):
+        return True
+
+    def _disable_control(self):
+        return True
+
+    def _set_full_color(self, r, g, b):
+        self.calls.append(("full", (r, g, b)))
+        return True
+
+    def _set_ind_color(self, keys):
+        self.calls.append(("ind", dict(keys)))
+        return True
+
+    @staticmethod
+    def is_product_supported(product, inventory=None):
+        return True
+
+
+class FakeFunction(object):
+    """Stand-in for a ctypes library function that records its calls"""
+
+    def __init__(self, library, name):
+        self._library = library
+        self._name = name
+        self.restype = None
+        self.argtypes = None
+
+    def __call__(self, *args):
+        self._library.calls[self._name] += 1
+        self._library.args[self._name] = args
+        return self._library.results.get(self._name, True)
+
+
+class FakeLibrary(object):
+    """
+    Stand-in for a library loaded with ctypes
+
+    Every function exists and returns True, unless another result is
+    set in results. The amount of calls per function is counted in
+    calls and the arguments of the last call are kept in args.
+    """
+
+    def __init__(self, **results):
+        self.results = results
+        self.calls = Counter()
+        self.args = dict()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        function = FakeFunction(self, name)
+        setattr(self, name, function)
+        return function
+
+
+class FakeLoader(object):
+    """Stand-in for ctypes.cdll that loads a FakeLibrary"""
+
+    def __init__(self, library):
+        self.library = library
+
+    def LoadLibrary(self, path):
+        return self.library
+
+
+class FakeCUESDK(object):
+    """Stand-in for the cue_sdk.api.CUESDK wrapper"""
+
+    def __init__(self, path, silence_errors=False):
+        self.control = False
+
+    def GetDeviceCount(self):
+        return 1
+
+    def request_control(self, mode):
+        self.control = True
+        return True
+
+    def release_control(self, mode):
+        self.control = False
+        return True
+
+
+class FakeCorsairLedColor(Structure):
+    """Stand-in for cue_sdk.structures.CorsairLedColor"""
+    _fields_ = [("ledId", c_int), ("r", c_int), ("g", c_int), ("b", c_int)]
+
+
+def install_cue_sdk():
+    """Install a stand-in cue_sdk package into sys.modules"""
+    modules = {
+        "cue_sdk.api": {"CUESDK": FakeCUESDK},
+        "cue_sdk.structures": {"CorsairLedColor": FakeCorsairLedColor},
+        "cue_sdk.enumerations": {"CAM": types.SimpleNamespace(
+            ExclusiveLightingControl=0)},
+    }
+    sys.modules.setdefault("cue_sdk", types.ModuleType("cue_sdk"))
+    for name, attributes in modules.items():
+        module = types.ModuleType(name)
+        module.__dict__.update(attributes)
+        module.__all__ = list(attributes)
+        sys.modules.setdefault(name, module)
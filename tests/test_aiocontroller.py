@@ -0,0 +1,41 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+import asyncio
+from unittest import TestCase
+# Project Modules
+from rgbkeyboards import AsyncKeyboardController, effects
+from fakes import FakeKeyboard
+
+
+class TestAsyncKeyboardController(TestCase):
+    """Tests the AsyncKeyboardController on an asyncio event loop"""
+
+    def test_effect(self):
+        kb = FakeKeyboard()
+
+        async def run():
+            async with AsyncKeyboardController(kb) as controller:
+                await controller.sched_effect(0, effects.build_flash((0, 255, 0), 0.05))
+                await asyncio.sleep(0.2)
+                self.assertFalse(controller._effects)
+            self.assertFalse(kb.is_control_enabled)
+
+        asyncio.run(run())
+        self.assertEqual(kb.calls, [("full", (0, 255, 0)), ("full", effects.OFF)])
+
+    def test_cancel_effect(self):
+        kb = FakeKeyboard()
+
+        async def run():
+            async with AsyncKeyboardController(kb) as controller:
+                effect_id = await controller.sched_effect(
+                    0.05, effects.build_flash((0, 255, 0), 0.05))
+                self.assertTrue(await controller.cancel_effect(effect_id))
+                await asyncio.sleep(0.15)
+
+        asyncio.run(run())
+        self.assertEqual(kb.calls, [])
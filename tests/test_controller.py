@@ -0,0 +1,289 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+from threading import Condition
+import time
+from unittest import TestCase
+# Project Modules
+from rgbkeyboards import KeyboardController, effects, layers
+from rgbkeyboards.clock import VirtualClock
+from fakes import FakeKeyboard
+
+# Upper bound in seconds for the thread to act on a submission, well
+# below the 50 ms the loop used to sleep when idle
+PROMPT = 0.025
+
+
+class NotifyingKeyboard(FakeKeyboard):
+    """FakeKeyboard that notifies a Condition for every call recorded"""
+
+    def _setup_lib(self):
+        FakeKeyboard._setup_lib(self)
+        self.changed = Condition()
+
+    def _set_full_color(self, r, g, b):
+        with self.changed:
+            FakeKeyboard._set_full_color(self, r, g, b)
+            self.changed.notify_all()
+        return True
+
+    def _set_ind_color(self, keys):
+        with self.changed:
+            FakeKeyboard._set_ind_color(self, keys)
+            self.changed.notify_all()
+        return True
+
+    def wait_for_calls(self, amount, timeout=1.0):
+        """Wait until at least amount calls were made, return seconds"""
+        start = time.time()
+        with self.changed:
+            while len(self.calls) < amount:
+                left = timeout - (time.time() - start)
+                if left <= 0:
+                    break
+                self.changed.wait(left)
+        return time.time() - start
+
+
+class TestKeyboardController(TestCase):
+    """Tests the KeyboardController using a VirtualClock"""
+
+    def setUp(self):
+        self.kb = FakeKeyboard()
+        self.clock = VirtualClock()
+        self.controller = KeyboardController(self.kb, clock=self.clock)
+        self.controller.update()
+
+    def test_update_control_already_enabled(self):
+        kb = FakeKeyboard()
+        self.assertTrue(kb.enable_control())
+        controller = KeyboardController(kb, clock=self.clock)
+        controller.update()
+        controller.set_full_color(0, (255, 0, 0))
+        controller.update()
+        self.assertEqual(kb.calls, [("full", (255, 0, 0))])
+
+    def test_command_not_executed_early(self):
+        self.controller.set_full_color(1, (255, 0, 0))
+        self.clock.advance(0.999)
+        self.controller.update()
+        self.assertEqual(self.kb.calls, [])
+        self.clock.advance(0.001)
+        self.controller.update()
+        self.assertEqual(self.kb.calls, [("full", (255, 0, 0))])
+
+    def test_late_command_skipped(self):
+        self.controller.set_full_color(1, (255, 0, 0))
+        self.clock.advance(2)
+        self.controller.update()
+        self.assertEqual(self.kb.calls, [])
+
+    def test_effect(self):
+        self.controller.sched_effect(0, effects.build_flash((0, 255, 0), 1))
+        self.controller.update()
+        self.assertEqual(self.kb.calls, [("full", (0, 255, 0))])
+        self.clock.advance(1)
+        self.controller.update()
+        self.assertEqual(self.kb.calls[-1], ("full", effects.OFF))
+
+    def test_cancel_effect(self):
+        effect_id = self.controller.sched_effect(
+            1, effects.build_breathe((255, 0, 0), 1))
+        self.controller.cancel_effect(effect_id)
+        self.clock.advance(2)
+        self.controller.update()
+        self.assertEqual(self.kb.calls, [])
+
+    def test_single_call_per_tick(self):
+        for color in ((255, 0, 0), (0, 255, 0), (0, 0, 255)):
+            self.controller.sched_effect(0, effects.build_breathe(color, 1))
+        self.controller.set_ind_color(0, {"esc": (1, 2, 3)}, overlay=True)
+        self.controller.update()
+        self.assertEqual(len(self.kb.calls), 1)
+        _, leds = self.kb.calls[0]
+        self.assertEqual(leds["esc"], (1, 2, 3))
+        self.assertEqual(len(leds), len(layers.KEYS))
+        self.clock.advance(0.5)
+        self.controller.update()
+        self.assertEqual(len(self.kb.calls), 2)
+        _, leds = self.kb.calls[1]
+        self.assertEqual(len(leds), len(layers.KEYS) - 1)
+
+    def test_layer_blending(self):
+        self.controller.set_full_color(0, (100, 0, 0))
+        self.controller.sched_effect(
+            0, effects.build_flash((0, 200, 0), 1), blend=layers.ADD)
+        self.controller.sched_effect(
+            0, effects.build_flash((0, 0, 200), 1), blend=layers.ALPHA,
+            opacity=0.5)
+        self.controller.set_ind_color(0, {"esc": (255, 255, 255)}, overlay=True)
+        self.controller.update()
+        self.assertEqual(len(self.kb.calls), 1)
+        _, leds = self.kb.calls[0]
+        self.assertEqual(leds["F1"], (50, 100, 100))
+        self.assertEqual(leds["esc"], (255, 255, 255))
+        self.clock.advance(1)
+        self.controller.update()
+        _, leds = self.kb.calls[-1]
+        self.assertNotIn("esc", leds)
+        self.assertEqual(leds["F1"], (100, 0, 0))
+        self.controller.clear_overlay(0)
+        self.controller.update()
+        self.assertEqual(self.kb.calls[-1], ("full", (100, 0, 0)))
+
+    def test_transition_keeps_final_color(self):
+        self.controller.set_full_color(0, (100, 0, 0))
+        self.controller.sched_effect(
+            0, effects.build_transition((0, 255, 0), (0, 0, 255), 1, r=0.25))
+        self.controller.update()
+        for _ in range(8):
+            self.clock.advance(0.25)
+            self.controller.update()
+        self.assertEqual(len(self.controller.layers.layers), 2)
+        final = effects.transition_color((0, 255, 0), (0, 0, 255), 1)(1)
+        self.assertEqual(self.kb.calls[-1], ("full", final))
+        self.assertEqual(self.controller.layers.base.fill, final)
+
+    def test_blended_effect_not_kept(self):
+        self.controller.set_full_color(0, (100, 0, 0))
+        self.controller.sched_effect(
+            0, effects.build_transition((0, 200, 0), (0, 0, 200), 1, r=0.25),
+            blend=layers.ADD)
+        self.controller.update()
+        for _ in range(8):
+            self.clock.advance(0.25)
+            self.controller.update()
+        self.assertEqual(self.kb.calls[-1], ("full", (100, 0, 0)))
+
+    def test_lazy_effect(self):
+        self.controller.sched_effect(0, effects.lazy_breathe((200, 0, 0), 3600))
+        self.controller.update()
+        self.assertEqual(self.kb.calls, [])  # Starts dark
+        self.clock.advance(1800)
+        self.controller.update()
+        self.assertEqual(self.kb.calls, [("full", (200, 0, 0))])
+        self.clock.advance(1801)
+        self.controller.update()
+        self.assertEqual(self.kb.calls[-1], ("full", effects.OFF))
+        self.assertEqual(len(self.controller.layers.layers), 2)
+
+    def test_compiled_effect_shared(self):
+        flash = effects.compile_effect(effects.build_flash((0, 0, 255), 1))
+        self.controller.sched_effect(0, flash)
+        self.controller.sched_effect(0.5, flash)
+        self.controller.update()
+        self.clock.advance(0.5)
+        self.controller.update()
+        self.clock.advance(0.5)
+        self.controller.update()
+        self.assertEqual(self.kb.calls, [("full", (0, 0, 255))])
+        self.clock.advance(0.5)
+        self.controller.update()
+        self.assertEqual(self.kb.calls[-1], ("full", effects.OFF))
+        self.assertEqual(len(flash), 2)
+
+    def test_cancel_effects_by_tag(self):
+        ids = [self.controller.sched_effect(
+            0, effects.lazy_breathe((0, 0, 255), 10, keys="esc"), tag="notify")
+            for _ in range(300)]
+        other = self.controller.sched_effect(0, effects.lazy_breathe((255, 0, 0), 10))
+        self.controller.update()
+        self.assertEqual(self.controller.cancel_effects("notify"), 300)
+        self.assertFalse(self.controller.cancel_effect(ids[0]))
+        self.assertEqual(len(self.controller._command_queue), 1)
+        self.controller.update()
+        self.assertEqual(len(self.controller.layers.layers), 3)
+        self.assertTrue(self.controller.cancel_effect(other))
+
+    def test_fixed_rate_drops_frames(self):
+        clock = self.clock
+
+        class SlowKeyboard(FakeKeyboard):
+            def _set_full_color(self, r, g, b):
+                clock.advance(0.05)
+                return FakeKeyboard._set_full_color(self, r, g, b)
+
+        kb = SlowKeyboard()
+        controller = KeyboardController(kb, clock=clock, fps=100)
+        controller.update()
+        controller.sched_effect(0, effects.build_breathe((0, 255, 0), 1))
+        start = clock.now()
+        while len(controller._effects) != 0:
+            clock.set(max(clock.now(), controller._start +
+                          controller._command_queue.peek()[0]))
+            controller.update()
+        self.assertLess(clock.now() - start, 1.1e9)
+        self.assertEqual(len(kb.calls), controller.stats.rendered - 1)
+        self.assertGreater(controller.stats.dropped, 50)
+        self.assertEqual(controller.stats.rendered + controller.stats.skipped, 101)
+        controller.close()
+
+    def tearDown(self):
+        self.controller.close()
+
+
+class TestKeyboardControllerThread(TestCase):
+    """Tests the Thread based loop of the KeyboardController"""
+
+    def setUp(self):
+        self.kb = NotifyingKeyboard()
+        self.controller = KeyboardController(self.kb)
+
+    def tearDown(self):
+        self.controller.stop()
+        if self.controller.is_alive():
+            self.controller.join()
+
+    def start(self, controller):
+        controller.start()
+        deadline = time.time() + 1.0
+        while not self.kb.is_control_enabled and time.time() < deadline:
+            time.sleep(0.001)
+        self.assertTrue(self.kb.is_control_enabled)
+
+    def test_set_ind_color_prompt(self):
+        self.start(self.controller)
+        time.sleep(0.01)  # Thread is waiting without a deadline
+        self.controller.set_ind_color(0, {"esc": (1, 2, 3)})
+        self.assertLess(self.kb.wait_for_calls(1), PROMPT)
+        self.assertEqual(self.kb.calls[0][1]["esc"], (1, 2, 3))
+
+    def test_sched_effect_prompt(self):
+        self.start(self.controller)
+        self.controller.set_ind_color(10, {"esc": (1, 2, 3)})
+        time.sleep(0.01)  # Thread is waiting for the command in 10 s
+        self.controller.sched_effect(0, effects.build_flash((0, 255, 0), 10))
+        self.assertLess(self.kb.wait_for_calls(1), PROMPT)
+        self.assertEqual(self.kb.calls, [("full", (0, 255, 0))])
+
+    def test_cancel_effect_wakes_loop(self):
+        self.start(self.controller)
+        effect_id = self.controller.sched_effect(0, effects.build_flash((0, 255, 0), 10))
+        self.kb.wait_for_calls(1)
+        self.assertTrue(self.controller.cancel_effect(effect_id))
+        self.assertLess(self.kb.wait_for_calls(2), PROMPT)
+        self.assertEqual(self.kb.calls[-1], ("full", effects.OFF))
+
+    def test_idle_makes_no_calls(self):
+        self.start(self.controller)
+        time.sleep(0.1)
+        self.assertEqual(self.kb.calls, [])
+
+    def test_stop(self):
+        self.start(self.controller)
+        self.controller.stop()
+        self.controller.join(1.0)
+        self.assertFalse(self.controller.is_alive())
+        self.assertFalse(self.kb.is_control_enabled)
+
+    def test_virtual_clock_fast_forward(self):
+        clock = VirtualClock()
+        controller = self.controller = KeyboardController(self.kb, clock=clock)
+        self.start(controller)
+        controller.sched_effect(0, effects.build_flash((0, 255, 0), 60))
+        self.assertLess(self.kb.wait_for_calls(2), 1.0)
+        self.assertEqual(self.kb.calls, [("full", (0, 255, 0)), ("full", effects.OFF)])
+        self.assertGreaterEqual(clock.now() - controller._start, 60e9)
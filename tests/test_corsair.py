@@ -0,0 +1,69 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+from unittest import TestCase
+# Project Modules
+from fakes import FakeLibrary, FakeLoader, install_cue_sdk
+
+install_cue_sdk()  # The back-end imports cue_sdk at module level
+from rgbkeyboards.windows.corsair import corsair
+
+
+class TestCorsair(TestCase):
+    """Tests the Corsair back-end against a fake SDK"""
+
+    def setUp(self):
+        self.library = FakeLibrary()
+        self.cdll, corsair.cdll = corsair.cdll, FakeLoader(self.library)
+
+    def tearDown(self):
+        corsair.cdll = self.cdll
+
+    def keyboard(self, asynchronous=False):
+        kb = corsair.Keyboard("CUESDK.dll", asynchronous)
+        self.assertTrue(kb.enable_control())
+        return kb
+
+    def test_changed_slice(self):
+        kb = self.keyboard()
+        kb.set_full_color(0, 0, 0)
+        count, _ = self.library.args["CorsairSetLedsColors"]
+        self.assertEqual(count, len(kb._all_leds))
+        self.assertTrue(kb.set_ind_color({"esc": (1, 2, 3), "F1": (4, 5, 6)}))
+        count, buffer = self.library.args["CorsairSetLedsColors"]
+        self.assertEqual(count, 2)
+        colors = sorted((c.ledId, c.r, c.g, c.b) for c in buffer[:count])
+        self.assertEqual(colors, [(1, 1, 2, 3), (2, 4, 5, 6)])
+        self.assertEqual(len(kb._buffers), 1)  # Reused for every call
+
+    def test_async(self):
+        kb = self.keyboard(asynchronous=True)
+        kb.set_ind_color({"esc": (1, 2, 3)})
+        count, first, callback, context = self.library.args["CorsairSetLedsColorsAsync"]
+        kb.set_ind_color({"esc": (4, 5, 6)})  # First call still pending
+        second = self.library.args["CorsairSetLedsColorsAsync"][1]
+        self.assertIsNot(first, second)
+        self.assertEqual((first[0].r, second[0].r), (1, 4))
+        callback(context, True, 0)
+        kb.set_ind_color({"esc": (7, 8, 9)})
+        self.assertIs(self.library.args["CorsairSetLedsColorsAsync"][1], first)
+        self.assertEqual(kb.current_frame()["esc"], (7, 8, 9))
+        callback(context, False, 3)  # Failure invalidates the cache
+        self.assertEqual(kb.current_frame(), {})
+
+    def test_async_callback_after_enable(self):
+        kb = self.keyboard(asynchronous=True)
+        kb.set_ind_color({"esc": (1, 2, 3)})
+        _, _, callback, first = self.library.args["CorsairSetLedsColorsAsync"]
+        kb.set_ind_color({"esc": (4, 5, 6)})
+        _, _, _, second = self.library.args["CorsairSetLedsColorsAsync"]
+        self.assertTrue(kb.disable_control())
+        self.assertTrue(kb.enable_control())
+        callback(second, True, 0)  # Completes after control was enabled again
+        self.assertTrue(kb.set_ind_color({"esc": (7, 8, 9)}))
+        self.assertTrue(kb.set_ind_color({"F1": (7, 8, 9)}))
+        callback(first, True, 0)
+        self.assertEqual(len(kb._buffers), 3)
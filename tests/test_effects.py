@@ -0,0 +1,63 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+from unittest import TestCase
+# Project Modules
+from rgbkeyboards import effects
+
+
+class TestEffects(TestCase):
+    """Tests the effect builders and their cache"""
+
+    def setUp(self):
+        effects.build_breathe.cache_clear()
+
+    def test_compile_effect(self):
+        effect = effects.Effect("test", [
+            effects.Instruction((1, 2, 3), ["esc", "F1"], 0.5),
+            effects.Instruction((4, 5, 6), effects.ALL_KEYS, 1.0)])
+        compiled = effects.compile_effect(effect)
+        self.assertEqual(len(effect.instr), 2)
+        self.assertEqual(compiled[0], ((1, 2, 3), ("esc", "F1"), 0.5))
+        self.assertEqual(compiled[1].key, effects.ALL_KEYS)
+        self.assertEqual(compiled.duration, 1.5)
+
+    def test_compile_effect_set_of_keys(self):
+        effect = effects.Effect("test", [
+            effects.Instruction((1, 2, 3), {"esc", "F1"}, 0.5),
+            effects.Instruction((4, 5, 6), "esc", 0.5),
+            effects.Instruction((7, 8, 9), {"esc", "F1"}, 0.5)])
+        compiled = effects.compile_effect(effect)
+        self.assertEqual(sorted(compiled[0].key), ["F1", "esc"])
+        self.assertEqual(compiled[1].key, "esc")
+        self.assertIs(compiled[2].key, compiled[0].key)
+
+    def test_builder_cache(self):
+        first = effects.build_breathe((255, 0, 0), 1, keys=["esc"])
+        second = effects.build_breathe((255, 0, 0), 1, keys=["esc"])
+        third = effects.build_breathe((0, 255, 0), 1)
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(effects.build_breathe.cache_info(), (1, 2, 128, 2))
+
+    def test_builder_cache_keys(self):
+        first = effects.build_breathe((255, 0, 0), 1, keys={"esc", "F1"})
+        second = effects.build_breathe((255, 0, 0), 1, keys={"F1", "esc"})
+        self.assertIs(first, second)
+        flash = effects.build_flash((255, 0, 0), 1, keys={"esc": None})
+        self.assertEqual(flash[0].key, ("esc",))
+        self.assertEqual(effects.build_breathe.cache_info().currsize, 1)
+
+    def test_cache_bounded(self):
+        effects.build_breathe.cache.maxsize = 2
+        try:
+            for i in range(4):
+                effects.build_breathe((i, 0, 0), 1)
+            self.assertEqual(effects.build_breathe.cache_info().currsize, 2)
+            effects.build_breathe((0, 0, 0), 1)
+            self.assertEqual(effects.build_breathe.cache_info().misses, 5)
+        finally:
+            effects.build_breathe.cache.maxsize = effects.CACHE_SIZE
@@ -0,0 +1,64 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+import time
+from timeit import default_timer
+from unittest import TestCase
+# Project Modules
+from rgbkeyboards.frame import KeyFrame
+from rgbkeyboards.group import KeyboardGroup
+from fakes import FakeKeyboard
+
+DELAY = 0.1
+
+
+class SlowKeyboard(FakeKeyboard):
+    """FakeKeyboard that takes DELAY seconds for every full color"""
+
+    def _set_full_color(self, r, g, b):
+        time.sleep(DELAY)
+        return FakeKeyboard._set_full_color(self, r, g, b)
+
+
+class FailingKeyboard(FakeKeyboard):
+    def _set_ind_color(self, keys):
+        FakeKeyboard._set_ind_color(self, keys)
+        return False
+
+
+class TestKeyboardGroup(TestCase):
+    """Tests the KeyboardGroup fan-out to its members"""
+
+    def test_fan_out(self):
+        members = [FakeKeyboard(), FakeKeyboard()]
+        group = KeyboardGroup(members)
+        self.assertTrue(group.enable_control())
+        self.assertTrue(all(kb.is_control_enabled for kb in members))
+        frame = KeyFrame({"esc": (1, 2, 3)})
+        self.assertTrue(group.set_frame(frame))
+        self.assertTrue(group.set_ind_color({"esc": (1, 2, 3), "F1": (4, 5, 6)}))
+        for kb in members:
+            self.assertEqual(kb.calls[-1], ("ind", {"F1": (4, 5, 6)}))
+            self.assertEqual(kb.current_frame()["esc"], (1, 2, 3))
+        self.assertTrue(group.disable_control())
+        self.assertFalse(any(kb.is_control_enabled for kb in members))
+        group.close()
+
+    def test_parallel(self):
+        group = KeyboardGroup([SlowKeyboard() for _ in range(4)])
+        group.enable_control()
+        start = default_timer()
+        self.assertTrue(group.set_full_color(255, 0, 0))
+        self.assertLess(default_timer() - start, 2.5 * DELAY)
+        group.close()
+
+    def test_failure(self):
+        members = [FakeKeyboard(), FailingKeyboard()]
+        group = KeyboardGroup(members)
+        group.enable_control()
+        self.assertFalse(group.set_ind_color({"esc": (1, 2, 3)}))
+        self.assertEqual(members[0].calls, [("ind", {"esc": (1, 2, 3)})])
+        group.close()
@@ -0,0 +1,41 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+import random
+from unittest import TestCase
+# Project Modules
+from rgbkeyboards._heap import IndexedHeap
+
+
+class TestIndexedHeap(TestCase):
+    """Tests the IndexedHeap used by the KeyboardController"""
+
+    def test_order(self):
+        heap = IndexedHeap()
+        priorities = [random.randint(0, 50) for _ in range(500)]
+        for id, priority in enumerate(priorities):
+            heap.push(priority, id, None)
+        popped = [heap.pop() for _ in range(len(priorities))]
+        self.assertEqual([p for p, _, _ in popped], sorted(priorities))
+        # Equal priorities are popped in the order they were pushed
+        for (p1, id1, _), (p2, id2, _) in zip(popped, popped[1:]):
+            if p1 == p2:
+                self.assertLess(id1, id2)
+
+    def test_remove(self):
+        heap = IndexedHeap()
+        for id in range(200):
+            heap.push(random.random(), id, id)
+        removed = set(random.sample(range(200), 100))
+        for id in removed:
+            self.assertTrue(heap.remove(id))
+        self.assertFalse(heap.remove(next(iter(removed))))
+        self.assertEqual(len(heap), 100)
+        result = list()
+        while len(heap) > 0:
+            result.append(heap.pop())
+        self.assertEqual([p for p, _, _ in result], sorted(p for p, _, _ in result))
+        self.assertEqual({id for _, id, _ in result}, set(range(200)) - removed)
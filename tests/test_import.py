@@ -0,0 +1,36 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+# Budget in seconds for import rgbkeyboards in a fresh interpreter
+IMPORT_BUDGET = 0.5
+# Modules that should only be loaded when used
+LAZY_MODULES = ("pynput", "rgbkeyboards.windows", "asyncio", "concurrent.futures")
+
+_SCRIPT = """
+from timeit import default_timer
+start = default_timer()
+import rgbkeyboards
+print(default_timer() - start)
+print(",".join(name for name in %r if name in __import__("sys").modules))
+"""
+
+
+class TestImport(TestCase):
+    """Tests that importing the package is fast and loads little"""
+
+    def test_import(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=root)
+        script = _SCRIPT % (LAZY_MODULES,)
+        output = subprocess.check_output([sys.executable, "-c", script], env=env)
+        duration, _, loaded = output.decode().partition("\n")
+        self.assertEqual(loaded.strip(), "")
+        self.assertLess(float(duration), IMPORT_BUDGET)
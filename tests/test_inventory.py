@@ -0,0 +1,158 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+# Project Modules
+from rgbkeyboards import keyboards, registry
+from rgbkeyboards.keyboards import Keyboards
+from rgbkeyboards.linux.masterkeys import Keyboard as MasterKeys
+from rgbkeyboards.utilities import Device, Inventory, UsbDevice
+
+VENDOR = MasterKeys.VENDOR
+
+
+def synthetic_inventory(n):
+    """Return an Inventory of n devices, one in ten a MasterKeys RGB"""
+    devices = list()
+    for i in range(n):
+        if i % 10 == 0:
+            devices.append(UsbDevice(VENDOR, "MasterKeys Pro L {}".format(i),
+                                     0x2516, 0x003b, 3))
+        else:
+            devices.append(UsbDevice("Vendor {}".format(i), "Device {}".format(i),
+                                     0x1000 + i, i, 1))
+    return Inventory(devices)
+
+
+class TestInventory(TestCase):
+    """Tests the USB Inventory snapshot and detection from it"""
+
+    def test_device_list(self):
+        inventory = Inventory([
+            UsbDevice(VENDOR, "MasterKeys Pro L", 0x2516, 0x003b, 3),
+            UsbDevice(VENDOR, "MasterKeys Pro L", 0x2516, 0x003b, 3),
+            UsbDevice(None, "Unknown", 0x0001, 0x0001, 1),
+            UsbDevice("Other", "Mouse", 0x0002, 0x0002, 1)])
+        self.assertEqual(inventory.device_list([VENDOR]),
+                         [Device(VENDOR, "MasterKeys Pro L")])
+        self.assertEqual(len(inventory.with_product("MasterKeys Pro L")), 2)
+        self.assertEqual(inventory.with_product("Keyboard"), [])
+
+    def test_product_supported(self):
+        inventory = Inventory([
+            UsbDevice(VENDOR, "MasterKeys Pro L", 0x2516, 0x003b, 3),
+            UsbDevice(VENDOR, "MasterKeys Lite L", 0x2516, 0x0001, 2)])
+        self.assertTrue(MasterKeys.is_product_supported("MasterKeys Pro L", inventory))
+        self.assertFalse(MasterKeys.is_product_supported("MasterKeys Lite L", inventory))
+        self.assertFalse(MasterKeys.is_product_supported("Mouse", inventory))
+
+    def test_detect_devices(self):
+        devices = Keyboards().detect_devices(synthetic_inventory(100))
+        self.assertEqual(len(devices), 10)
+        self.assertTrue(all(device.vendor == VENDOR for device in devices))
+
+    def test_detect_by_id(self):
+        inventory = Inventory([
+            UsbDevice(None, "Keyboard", 0x2516, 0x0047, None),
+            UsbDevice(VENDOR, "Keyboard", 0x2516, 0x9999, 1)])
+        self.assertEqual(Keyboards().detect_devices(inventory),
+                         [Device(VENDOR, "Keyboard")])
+
+
+class TestSysfsInventory(TestCase):
+    """Tests the Inventory of a fake sysfs tree"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.make("1-1", idVendor="2516", idProduct="003b", bNumInterfaces=" 3",
+                  manufacturer=VENDOR, product="MasterKeys Pro L")
+        self.make("1-1:1.0", bInterfaceNumber="00")
+        self.make("1-2", idVendor="046d", idProduct="c52b", bNumInterfaces=" 1")
+        self.make("usb1", idVendor="1d6b", idProduct="0002", bNumInterfaces=" 1",
+                  manufacturer="Linux Foundation", product="2.0 root hub")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def make(self, name, **attributes):
+        path = os.path.join(self.root, name)
+        os.mkdir(path)
+        for attribute, value in attributes.items():
+            with open(os.path.join(path, attribute), "w") as fo:
+                fo.write(value + "\n")
+
+    def test_from_sysfs(self):
+        inventory = Inventory.from_sysfs(self.root)
+        self.assertEqual(list(inventory), [
+            UsbDevice(VENDOR, "MasterKeys Pro L", 0x2516, 0x003b, 3),
+            UsbDevice(None, None, 0x046d, 0xc52b, 1),
+            UsbDevice("Linux Foundation", "2.0 root hub", 0x1d6b, 0x0002, 1)])
+        self.assertTrue(MasterKeys.is_product_supported("MasterKeys Pro L", inventory))
+        self.assertEqual(inventory.device_list([VENDOR]),
+                         [Device(VENDOR, "MasterKeys Pro L")])
+
+
+class TestRegistry(TestCase):
+    """Tests the registry of supported models by USB identifiers"""
+
+    def test_lookup(self):
+        model = registry.lookup(registry.COOLER_MASTER, 0x003b)
+        self.assertEqual(model.name, "MasterKeys")
+        self.assertGreater(model.leds, 100)
+        self.assertIsNone(registry.lookup(registry.COOLER_MASTER, 0xffff))
+        self.assertEqual(registry.vendor_name(registry.LOGITECH), "Logitech, Inc.")
+
+
+class TestBackendLoading(TestCase):
+    """Tests the cached loading of back-ends"""
+
+    def test_load_backend(self):
+        backend = keyboards.load_backend("rgbkeyboards.linux.masterkeys")
+        self.assertIs(backend, MasterKeys)
+        self.assertIs(keyboards.load_backend("rgbkeyboards.linux.masterkeys"), backend)
+        self.assertIn("rgbkeyboards.linux.masterkeys", Keyboards.import_times())
+        self.assertRaises(RuntimeError, keyboards.load_backend, "rgbkeyboards.missing")
+
+    def test_entry_points(self):
+        iter_entry_points = keyboards._iter_entry_points
+        keyboards._iter_entry_points = lambda: [
+            ("Plugin Vendor", "rgbkeyboards.linux.masterkeys:Keyboard"),
+            (VENDOR, "plugin.masterkeys:Keyboard")]
+        keyboards.BACKENDS["plugin"] = {VENDOR: "rgbkeyboards.linux.masterkeys"}
+        try:
+            keyboards.add_entry_points("plugin")
+        finally:
+            keyboards._iter_entry_points = iter_entry_points
+            backends = keyboards.BACKENDS.pop("plugin")
+            keyboards._entry_points_loaded.discard("plugin")
+        self.assertEqual(backends, {
+            "Plugin Vendor": "rgbkeyboards.linux.masterkeys:Keyboard",
+            VENDOR: "rgbkeyboards.linux.masterkeys"})
+        self.assertIs(keyboards.load_backend(backends["Plugin Vendor"]), MasterKeys)
+
+
+class RecordingKeyboards(Keyboards):
+    """Keyboards that records the back-ends instead of initializing them"""
+
+    def init_backend(self, Keyboard, device):
+        return Keyboard, device
+
+
+class TestKeyboards(TestCase):
+    """Tests the discovery of multiple keyboards"""
+
+    def test_one_per_backend(self):
+        inventory = Inventory([
+            UsbDevice(VENDOR, "MasterKeys Pro L", 0x2516, 0x003b, 3),
+            UsbDevice(VENDOR, "MasterKeys Pro L EU", 0x2516, 0x0047, 3),
+            UsbDevice("Other", "Mouse", 0x0002, 0x0002, 1)])
+        keyboards = RecordingKeyboards()
+        self.assertEqual(len(keyboards.detect_devices(inventory)), 2)
+        self.assertEqual(keyboards.keyboards(inventory), [
+            (MasterKeys, Device(VENDOR, "MasterKeys Pro L"))])
@@ -0,0 +1,168 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+from threading import Event
+import time
+from unittest import TestCase
+# Project Modules
+from rgbkeyboards import keygroups
+from rgbkeyboards.frame import FramePool, KeyFrame, KEYS
+from fakes import FakeKeyboard
+
+
+class TestBaseKeyboard(TestCase):
+    """Tests the BaseKeyboard interface using a fake back-end"""
+
+    def setUp(self):
+        self.kb = FakeKeyboard()
+        self.kb.enable_control()
+
+    def test_unchanged_keys_suppressed(self):
+        self.kb.set_ind_color({"esc": (1, 2, 3), "F1": (4, 5, 6)})
+        self.kb.set_ind_color({"esc": (1, 2, 3), "F1": (0, 0, 0)})
+        self.assertTrue(self.kb.set_ind_color({"esc": (1, 2, 3)}))
+        self.assertEqual(self.kb.calls, [
+            ("ind", {"esc": (1, 2, 3), "F1": (4, 5, 6)}),
+            ("ind", {"F1": (0, 0, 0)})])
+        self.assertEqual(self.kb.keys_sent, 3)
+        self.assertEqual(self.kb.keys_suppressed, 2)
+
+    def test_full_color(self):
+        self.kb.set_full_color(255, 0, 0)
+        self.kb.set_full_color(255, 0, 0)
+        self.kb.set_ind_color({"esc": (255, 0, 0)})
+        self.assertEqual(self.kb.calls, [("full", (255, 0, 0))])
+        self.kb.set_ind_color({"esc": (0, 0, 0)})
+        self.kb.set_full_color(255, 0, 0)
+        self.assertEqual(len(self.kb.calls), 3)
+        frame = self.kb.current_frame()
+        self.assertEqual(frame["esc"], (255, 0, 0))
+        self.assertEqual(frame["F12"], (255, 0, 0))
+
+    def test_failed_call_invalidates(self):
+        self.kb._set_ind_color = lambda keys: False
+        self.assertFalse(self.kb.set_ind_color({"esc": (1, 2, 3)}))
+        self.assertNotIn("esc", self.kb.current_frame())
+
+    def test_set_frame(self):
+        frame = KeyFrame({"esc": (1, 2, 3)})
+        self.kb.set_frame(frame)
+        _, leds = self.kb.calls[-1]
+        self.assertEqual(len(leds), len(KEYS))
+        frame["F1"] = (4, 5, 6)
+        self.kb.set_frame(frame)
+        self.assertEqual(self.kb.calls[-1], ("ind", {"F1": (4, 5, 6)}))
+        self.assertTrue(self.kb.set_frame(frame))
+        self.assertEqual(len(self.kb.calls), 2)
+        frame.fill(7, 8, 9)
+        self.kb.set_frame(frame)
+        self.assertEqual(self.kb.calls[-1], ("full", (7, 8, 9)))
+        self.assertEqual(self.kb.current_frame(), frame.to_dict())
+
+    def test_request_invalidate(self):
+        self.kb.set_ind_color({"esc": (1, 2, 3)})
+        with self.kb._lock:  # A call is in progress
+            self.kb._request_invalidate()
+        self.kb.set_ind_color({"esc": (1, 2, 3)})
+        self.assertEqual(len(self.kb.calls), 2)
+        self.kb._request_invalidate()
+        self.assertEqual(self.kb.current_frame(), {})
+
+    def test_frame_pool(self):
+        pool = FramePool(size=1)
+        frame = pool.acquire()
+        pool.release(frame)
+        self.assertIs(pool.acquire(), frame)
+        self.assertIsNot(pool.acquire(), frame)
+
+    def tearDown(self):
+        self.kb.disable_control()
+
+
+class TestKeyRegistry(TestCase):
+    """Tests the integer key ids and translation tables"""
+
+    def test_key_ids(self):
+        self.assertEqual(len(keygroups.key_names), len(set(keygroups.key_names)))
+        for i, name in enumerate(keygroups.key_names):
+            self.assertEqual(keygroups.key_id(name), i)
+        self.assertEqual(KEYS, keygroups.key_names)
+        self.assertIn("win_r", keygroups.key_ids)
+
+    def test_build_table(self):
+        table = keygroups.build_table({"esc": 1, "F1": 2}, default=0)
+        self.assertEqual(len(table), len(keygroups.key_names))
+        self.assertEqual(table[keygroups.key_id("esc")], 1)
+        self.assertEqual(table[keygroups.key_id("F1")], 2)
+        self.assertEqual(sum(table), 3)
+
+
+class BlockingKeyboard(FakeKeyboard):
+    """FakeKeyboard of which calls block until released"""
+
+    def _setup_lib(self):
+        FakeKeyboard._setup_lib(self)
+        self.entered, self.release = Event(), Event()
+
+    def _set_ind_color(self, keys):
+        self.entered.set()
+        self.release.wait()
+        return FakeKeyboard._set_ind_color(self, keys)
+
+
+class LateWriterKeyboard(FakeKeyboard):
+    """FakeKeyboard of which the writer Thread starts running late"""
+
+    def _write_loop(self, *args):
+        time.sleep(0.05)
+        return FakeKeyboard._write_loop(self, *args)
+
+
+class TestWriter(TestCase):
+    """Tests the asynchronous submission through the writer Thread"""
+
+    def setUp(self):
+        self.kb = BlockingKeyboard()
+        self.kb.enable_control()
+        self.kb.start_writer()
+
+    def tearDown(self):
+        self.kb.release.set()
+        self.kb.disable_control()
+
+    def test_latest_wins(self):
+        self.assertTrue(self.kb.set_ind_color({"esc": (1, 1, 1)}))
+        self.assertTrue(self.kb.entered.wait(5))  # Writer is sending
+        self.kb.set_ind_color({"esc": (2, 2, 2), "F1": (2, 2, 2)})
+        self.kb.set_ind_color({"esc": (3, 3, 3)})
+        self.kb.release.set()
+        self.kb.flush()
+        self.assertEqual(self.kb.calls, [
+            ("ind", {"esc": (1, 1, 1)}),
+            ("ind", {"esc": (3, 3, 3), "F1": (2, 2, 2)})])
+
+    def test_frame_replaces_keys(self):
+        self.kb.set_ind_color({"esc": (1, 1, 1)})
+        self.assertTrue(self.kb.entered.wait(5))
+        self.kb.set_ind_color({"F1": (2, 2, 2)})
+        frame = KeyFrame()
+        frame.fill(4, 4, 4)
+        self.kb.set_frame(frame)
+        self.kb.set_ind_color({"F2": (5, 5, 5)})
+        self.kb.release.set()
+        self.kb.stop_writer()
+        self.assertEqual(self.kb.calls[-1], ("ind", {
+            key: (5, 5, 5) if key == "F2" else (4, 4, 4) for key in KEYS}))
+
+    def test_stop_before_start(self):
+        kb = LateWriterKeyboard()
+        kb.enable_control()
+        kb.start_writer()
+        kb.stop_writer()
+        kb.start_writer()
+        kb.set_ind_color({"esc": (1, 2, 3)})
+        kb.disable_control()
+        self.assertEqual(kb.calls, [("ind", {"esc": (1, 2, 3)})])
@@ -0,0 +1,57 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+from unittest import TestCase
+# Project Modules
+from rgbkeyboards.frame import KeyFrame
+from rgbkeyboards.utilities import Inventory, UsbDevice
+from rgbkeyboards.windows.logitech import logitech
+from fakes import FakeLibrary, FakeLoader
+
+
+class TestLogitech(TestCase):
+    """Tests the Logitech back-end against a fake SDK"""
+
+    def setUp(self):
+        self.library = FakeLibrary()
+        self.cdll, logitech.cdll = logitech.cdll, FakeLoader(self.library)
+        device = UsbDevice(logitech.Keyboard.VENDOR, "G810 Orion Spectrum",
+                           0x046d, 0xc337, 1)
+        self.inventory = logitech.Inventory
+        logitech.Inventory = type("Inventory", (Inventory,), {
+            "snapshot": classmethod(lambda cls: cls([device]))})
+
+    def tearDown(self):
+        logitech.cdll = self.cdll
+        logitech.Inventory = self.inventory
+
+    def test_per_key(self):
+        kb = logitech.Keyboard("Logitech.dll")
+        self.assertTrue(kb.enable_control())
+        kb.set_full_color(0, 0, 0)
+        self.assertTrue(kb.set_ind_color({"esc": (255, 0, 0), "F1": (0, 255, 0)}))
+        self.assertEqual(self.library.calls["LogiLedSetLightingForKeyWithKeyName"], 2)
+        self.assertEqual(self.library.calls["LogiLedSetLightingFromBitmap"], 0)
+
+    def test_bitmap(self):
+        kb = logitech.Keyboard("Logitech.dll", True)
+        self.assertTrue(kb.enable_control())
+        kb.set_full_color(1, 2, 3)
+        self.assertTrue(kb.set_ind_color({"esc": (255, 0, 0), "F1": (0, 255, 0)}))
+        self.assertEqual(self.library.calls["LogiLedSetLightingForKeyWithKeyName"], 0)
+        self.assertEqual(self.library.calls["LogiLedSetLightingFromBitmap"], 1)
+        bitmap = bytearray(self.library.args["LogiLedSetLightingFromBitmap"][0])
+        self.assertEqual(len(bitmap), logitech.BITMAP_SIZE)
+        self.assertEqual(bitmap[0:8], bytearray((0, 0, 255, 255, 0, 255, 0, 255)))
+        self.assertEqual(bitmap[84:88], bytearray((3, 2, 1, 255)))
+
+    def test_bitmap_complete_frame(self):
+        kb = logitech.Keyboard("Logitech.dll", True)
+        kb.enable_control()
+        frame = KeyFrame({"esc": (255, 0, 0)})
+        self.assertTrue(kb.set_frame(frame))
+        self.assertEqual(self.library.calls["LogiLedSetLightingFromBitmap"], 1)
+        self.assertEqual(self.library.calls["LogiLedSetLightingForKeyWithKeyName"], 0)
@@ -0,0 +1,125 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+import sys
+import time
+from unittest import TestCase
+# Project Modules
+from rgbkeyboards.frame import KeyFrame
+from rgbkeyboards.windows.masterkeys import masterkeys
+from rgbkeyboards.windows.masterkeys.keys import US
+from fakes import FakeLibrary, FakeLoader
+
+
+class TestWindowsMasterKeys(TestCase):
+    """Tests the Windows MasterKeys back-end against a fake SDK"""
+
+    def setUp(self):
+        self.library = FakeLibrary(GetDeviceLayout=US, SetControlDevice=None)
+        self.cdll, masterkeys.cdll = masterkeys.cdll, FakeLoader(self.library)
+        self.kb = masterkeys.Keyboard("SDKDLL.dll")
+        self.assertTrue(self.kb.enable_control())
+
+    def tearDown(self):
+        masterkeys.cdll = self.cdll
+
+    def test_ind_color_per_key(self):
+        self.assertTrue(self.kb.set_ind_color({"esc": (1, 2, 3), "F1": (4, 5, 6)}))
+        self.assertEqual(self.library.calls["SetLedColor"], 2)
+        self.assertEqual(self.library.calls["SetAllLedColor"], 0)
+
+    def test_matrix_after_full_color(self):
+        self.kb.set_full_color(10, 20, 30)
+        frame = KeyFrame()
+        frame.fill(10, 20, 30)
+        for key in ("esc", "F1", "F2", "F3", "F4", "F5", "F6", "F7", "F8"):
+            frame[key] = (200, 0, 0)
+        self.assertTrue(self.kb.set_frame(frame))
+        self.assertEqual(self.library.calls["SetLedColor"], 0)
+        self.assertEqual(self.library.calls["SetAllLedColor"], 1)
+        matrix = self.library.args["SetAllLedColor"][0]
+        cell = matrix.KeyColor[0][0]
+        self.assertEqual((cell.r, cell.g, cell.b), (200, 0, 0))
+        cell = matrix.KeyColor[5][0]
+        self.assertEqual((cell.r, cell.g, cell.b), (10, 20, 30))
+
+    def test_no_matrix_while_unknown(self):
+        keys = {key: (1, 1, 1) for key in ("esc", "F1", "F2", "F3", "F4",
+                                           "F5", "F6", "F7", "F8")}
+        self.kb.set_ind_color(keys)
+        self.assertEqual(self.library.calls["SetAllLedColor"], 0)
+        self.assertEqual(self.library.calls["SetLedColor"], len(keys))
+
+    def test_unregistered_keys(self):
+        self.assertTrue(self.kb.set_ind_color({"win_r": (1, 2, 3), "unknown": (1, 1, 1)}))
+        self.assertEqual(self.library.calls["SetLedColor"], 1)
+
+
+class TestLinuxMasterKeys(TestCase):
+    """Tests the Linux MasterKeys back-end against a fake module"""
+
+    def setUp(self):
+        self.library = FakeLibrary(
+            detect_devices=[0], set_device=0, enable_control=0, disable_control=0,
+            get_device_ident=0x003b, set_all_led_color=0, set_ind_led_color=0,
+            set_full_led_color=0)
+        self.library.SUCCESS = 0
+        self.library.build_layout_list = lambda: [[(0, 0, 0)] * 22 for _ in range(6)]
+        self.module = sys.modules.get("masterkeys")
+        sys.modules["masterkeys"] = self.library
+        from rgbkeyboards.linux.masterkeys import Keyboard
+        self.kb = Keyboard()
+        self.assertTrue(self.kb.enable_control())
+        self.library.calls.clear()
+
+    def tearDown(self):
+        if self.module is None:
+            del sys.modules["masterkeys"]
+        else:
+            sys.modules["masterkeys"] = self.module
+
+    def test_per_led_below_crossover(self):
+        self.kb._crossover = 3
+        self.assertTrue(self.kb.set_ind_color({"esc": (1, 2, 3), "F1": (4, 5, 6)}))
+        self.assertEqual(self.library.calls["set_ind_led_color"], 2)
+        self.assertEqual(self.library.calls["set_all_led_color"], 0)
+
+    def test_full_matrix_at_crossover(self):
+        self.kb._crossover = 3
+        keys = {"esc": (1, 2, 3), "F1": (4, 5, 6), "F2": (7, 8, 9)}
+        self.assertTrue(self.kb.set_ind_color(keys))
+        self.assertEqual(self.library.calls["set_ind_led_color"], 0)
+        self.assertEqual(self.library.calls["set_all_led_color"], 1)
+        lighting = self.library.args["set_all_led_color"][0]
+        self.assertEqual(lighting[0][0], (1, 2, 3))
+
+    def test_resend_after_failure(self):
+        self.kb._crossover = 3
+        self.library.results["set_ind_led_color"] = 1
+        self.assertFalse(self.kb.set_ind_color({"esc": (1, 2, 3)}))
+        self.library.results["set_ind_led_color"] = 0
+        self.library.calls.clear()
+        # The failed cell is still dirty and is sent along with the new one
+        self.assertTrue(self.kb.set_ind_color({"F1": (4, 5, 6)}))
+        self.assertEqual(self.library.calls["set_ind_led_color"], 2)
+        self.library.calls.clear()
+        self.assertTrue(self.kb.set_ind_color({"F1": (7, 8, 9)}))
+        self.assertEqual(self.library.calls["set_ind_led_color"], 1)
+
+    def test_crossover_measured_once(self):
+        def set_all_led_color(lighting):
+            self.library.calls["set_all_led_color"] += 1
+            time.sleep(0.005)
+            return 0
+        self.library.set_all_led_color = set_all_led_color
+        self.library.get_device_ident = lambda: 0x0047
+        self.assertTrue(self.kb.disable_control())
+        self.assertTrue(self.kb.enable_control())
+        self.assertEqual(self.library.calls["set_all_led_color"], self.kb.CROSSOVER_SAMPLES)
+        self.assertGreater(self.kb._crossover, 1)
+        self.assertTrue(self.kb.disable_control())
+        self.assertTrue(self.kb.enable_control())
+        self.assertEqual(self.library.calls["set_all_led_color"], self.kb.CROSSOVER_SAMPLES)
@@ -0,0 +1,112 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2017-2018 RedFantom
+"""
+# Standard Library
+import os
+import shutil
+import tempfile
+import time
+from threading import Thread
+from unittest import TestCase
+# Project Modules
+from rgbkeyboards.monitor import DeviceMonitor, parse_uevent
+from rgbkeyboards.utilities import Device
+
+VENDOR = "Cooler Master Technology Inc."
+PRODUCT = "MasterKeys Pro L"
+
+
+def uevent(action, devpath, devtype="usb_device"):
+    """Return a synthetic kernel uevent message"""
+    properties = ["ACTION=" + action, "DEVPATH=" + devpath,
+                  "SUBSYSTEM=usb", "DEVTYPE=" + devtype, "SEQNUM=1"]
+    return "\x00".join(["{}@{}".format(action, devpath)] + properties).encode() + b"\x00"
+
+
+class TestDeviceMonitor(TestCase):
+    """Tests the DeviceMonitor against a fake sysfs tree"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.events = list()
+        self.monitor = DeviceMonitor(
+            on_attach=lambda device: self.events.append(("attach", device)),
+            on_detach=lambda device: self.events.append(("detach", device)),
+            root=self.root)
+        self.add("1-2", "046d", "c52b", None)
+        self.monitor.scan()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def add(self, name, vendor_id, product_id, product):
+        path = os.path.join(self.root, name)
+        os.mkdir(path)
+        attributes = {"idVendor": vendor_id, "idProduct": product_id,
+                      "bNumInterfaces": " 3"}
+        if product is not None:
+            attributes.update(manufacturer=VENDOR, product=product)
+        for attribute, value in attributes.items():
+            with open(os.path.join(path, attribute), "w") as fo:
+                fo.write(value + "\n")
+
+    def remove(self, name):
+        shutil.rmtree(os.path.join(self.root, name))
+
+    def test_parse_uevent(self):
+        event = parse_uevent(uevent("add", "/devices/pci0000:00/usb1/1-1"))
+        self.assertEqual(event["ACTION"], "add")
+        self.assertEqual(event["DEVTYPE"], "usb_device")
+        self.assertIsNone(parse_uevent(b"libudev\x00\xfe\xed"))
+
+    def test_uevents(self):
+        device = Device(VENDOR, PRODUCT)
+        self.add("1-1", "2516", "003b", PRODUCT)
+        self.monitor.handle_uevent(uevent("add", "/devices/usb1/1-1/1-1:1.0", "usb_interface"))
+        self.assertEqual(self.events, [])
+        self.monitor.handle_uevent(uevent("add", "/devices/usb1/1-1"))
+        self.assertEqual(self.events, [("attach", device)])
+        self.assertEqual(self.monitor.devices, [device])
+        self.remove("1-1")
+        self.monitor.handle_uevent(uevent("remove", "/devices/usb1/1-1"))
+        self.monitor.handle_uevent(uevent("remove", "/devices/usb1/1-2"))
+        self.assertEqual(self.events, [("attach", device), ("detach", device)])
+        self.assertEqual(self.monitor.devices, [])
+
+    def test_poll(self):
+        device = Device(VENDOR, PRODUCT)
+        self.monitor.poll()
+        self.assertEqual(self.events, [])
+        self.add("1-3", "2516", "0047", PRODUCT)
+        self.monitor.poll()
+        self.monitor.poll()
+        self.assertEqual(self.events, [("attach", device)])
+        self.remove("1-3")
+        self.monitor.poll()
+        self.assertEqual(self.events, [("attach", device), ("detach", device)])
+
+    def test_callback_error(self):
+        def on_attach(device):
+            self.events.append(("attach", device))
+            if len(self.events) == 1:
+                raise RuntimeError("Callback failed")
+        monitor = DeviceMonitor(on_attach=on_attach, root=self.root, interval=0.01)
+        monitor.scan()
+        Thread.start(monitor)  # Polls sysfs without opening a socket
+        try:
+            self.add("1-3", "2516", "0047", PRODUCT)
+            self.wait_for_events(1)
+            self.add("1-4", "2516", "003b", PRODUCT)
+            self.wait_for_events(2)
+            self.assertTrue(monitor.is_alive())
+        finally:
+            monitor.stop()
+        self.assertEqual(len(monitor.devices), 2)
+
+    def wait_for_events(self, amount, timeout=2.0):
+        deadline = time.time() + timeout
+        while len(self.events) < amount and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.events), amount)